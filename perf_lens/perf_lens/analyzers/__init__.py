@@ -5,6 +5,7 @@ from .cpu import CPUAnalyzer
 from .cache import CacheAnalyzer
 from .syscall import SyscallAnalyzer
 from .thread import ThreadAnalyzer
+from .runner import run_all
 
 __all__ = [
     "MemoryAnalyzer",
@@ -12,4 +13,5 @@ __all__ = [
     "CacheAnalyzer",
     "SyscallAnalyzer",
     "ThreadAnalyzer",
+    "run_all",
 ]
@@ -0,0 +1,137 @@
+"""
+External tool discovery and invocation shared by the analyzers.
+
+Lookups walk $PATH and stat several locations, so results are memoized for
+the lifetime of the process. Call ``cache_clear()`` on these functions to
+force a fresh lookup (e.g. in tests).
+"""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Coroutine, Iterator, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+@functools.lru_cache(maxsize=None)
+def find_tool(name: str) -> Optional[str]:
+    """Return the full path of an executable on $PATH, or None."""
+    return shutil.which(name)
+
+
+@functools.lru_cache(maxsize=None)
+def find_flamegraph_script() -> Optional[str]:
+    """Find flamegraph.pl script in common locations."""
+    # Check bundled resource first
+    package_dir = Path(__file__).parent.parent
+    bundled = package_dir / "resources" / "flamegraph.pl"
+    if bundled.exists():
+        return str(bundled)
+
+    # Check system path
+    system_path = find_tool("flamegraph.pl")
+    if system_path:
+        return system_path
+
+    # Check common installation locations
+    common_paths = [
+        Path.home() / "FlameGraph" / "flamegraph.pl",
+        Path("/usr/local/bin/flamegraph.pl"),
+        Path("/opt/FlameGraph/flamegraph.pl"),
+    ]
+    for path in common_paths:
+        if path.exists():
+            return str(path)
+
+    return None
+
+
+@contextlib.contextmanager
+def temp_log_path() -> Iterator[str]:
+    """Yield the path of a fresh temp file for a tool log; removed on exit."""
+    fd, path = tempfile.mkstemp(prefix="perf-lens-", suffix=".log")
+    os.close(fd)
+    try:
+        yield path
+    finally:
+        os.unlink(path)
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run an analyzer coroutine to completion from synchronous code.
+    
+    asyncio.run() refuses to start inside a running event loop (Jupyter, an
+    async application), so there the coroutine gets its own loop in a worker
+    thread. The caller blocks until it finishes either way; async callers
+    should await the analyze_async() variants instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def run_tool(
+    cmd: list[str],
+    timeout: int,
+    log_path: Optional[str] = None,
+    env: Optional[dict[str, str]] = None
+) -> tuple[bytes, Optional[str]]:
+    """
+    Run an analysis tool and collect its report.
+    
+    Args:
+        cmd: Full command line, tool path first
+        timeout: Maximum execution time in seconds
+        log_path: File the tool writes its report to; if None the report
+            is taken from the tool's stderr. An empty log is an error,
+            reported with the tool's stderr
+        env: Optional environment for the tool process
+        
+    Returns:
+        Tuple of (report bytes, error message or None)
+    """
+    try:
+        # Spool stderr to a temp file as raw bytes rather than buffering it
+        # through a pipe
+        with tempfile.TemporaryFile() as errf:
+            proc = subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=errf,
+                timeout=timeout,
+                env=env
+            )
+            errf.seek(0)
+            if log_path is None:
+                return errf.read(), None
+            
+            with open(log_path, "rb") as f:
+                report = f.read()
+            if report.strip():
+                # The tool's exit status may just be the target's; a written
+                # report means the run itself worked
+                return report, None
+            
+            # No report: the tool failed before tracing (ptrace denied, bad
+            # option, ...) and said why on stderr
+            message = errf.read().decode("utf-8", errors="replace").strip()
+            return b"", message or (
+                f"{os.path.basename(cmd[0])} exited with status "
+                f"{proc.returncode} without writing a report"
+            )
+    except subprocess.TimeoutExpired:
+        return b"", f"Analysis timed out after {timeout} seconds"
+    except Exception as e:
+        return b"", str(e)
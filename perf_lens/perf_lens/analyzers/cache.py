@@ -4,13 +4,48 @@ Cache Performance Analyzer using perf stat.
 Analyzes L1/L2/L3 cache hit/miss rates using hardware performance counters.
 """
 
-import re
+import asyncio
+import os
+import select
+import signal
 import subprocess
-import shutil
+import tempfile
+import threading
+import time
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Optional
 
+from .. import _fastparse
+from ._tools import find_tool, run_coroutine
+
+
+# Only the tail of the tool output is kept in raw_output
+_RAW_OUTPUT_TAIL = 64 * 1024
+
+# Legacy names used in CACHE_EVENT_GROUPS that perf list reports under another name
+_EVENT_ALIASES = {"cycles": "cpu-cycles"}
+
+
+@lru_cache(maxsize=None)
+def _supported_events(perf_path: str) -> Optional[frozenset[str]]:
+    """
+    Return the hardware/cache events this machine's PMU supports.
+    
+    Returns None if perf cannot be queried, in which case no filtering
+    should be applied.
+    """
+    try:
+        out = subprocess.check_output(
+            [perf_path, "list", "--raw-dump", "hw", "cache"],
+            stderr=subprocess.DEVNULL,
+            timeout=30
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return frozenset(out.decode("utf-8", errors="replace").split())
+
 
 @dataclass
 class CacheStats:
@@ -43,13 +78,68 @@ class CacheAnalysisResult:
     duration_seconds: float
     total_cycles: int
     total_instructions: int
-    ipc: float  # Instructions Per Cycle
-    cache_stats: list[CacheStats]
+    _stats_dict: dict[str, int]  # Raw event counts keyed by perf event name
     branch_misses: int
     branch_total: int
     raw_output: str
     error: Optional[str] = None
     
+    @cached_property
+    def ipc(self) -> float:
+        """Instructions Per Cycle."""
+        if self.total_cycles == 0:
+            return 0.0
+        return self.total_instructions / self.total_cycles
+    
+    @cached_property
+    def l1d(self) -> Optional[CacheStats]:
+        """L1 data cache statistics, if the counters were reported."""
+        loads = self._stats_dict.get("L1-dcache-loads", 0)
+        misses = self._stats_dict.get("L1-dcache-load-misses", 0)
+        if loads == 0 and misses == 0:
+            return None
+        return CacheStats(
+            level="L1-Data",
+            loads=loads,
+            load_misses=misses,
+            stores=self._stats_dict.get("L1-dcache-stores", 0),
+            store_misses=0
+        )
+    
+    @cached_property
+    def llc(self) -> Optional[CacheStats]:
+        """Last Level Cache (usually L3) statistics, if reported."""
+        loads = self._stats_dict.get("LLC-loads", 0)
+        stores = self._stats_dict.get("LLC-stores", 0)
+        if loads == 0 and stores == 0:
+            return None
+        return CacheStats(
+            level="LLC (L3)",
+            loads=loads,
+            load_misses=self._stats_dict.get("LLC-load-misses", 0),
+            stores=stores,
+            store_misses=self._stats_dict.get("LLC-store-misses", 0)
+        )
+    
+    @cached_property
+    def overall(self) -> Optional[CacheStats]:
+        """Generic cache-references/cache-misses statistics, if reported."""
+        refs = self._stats_dict.get("cache-references", 0)
+        if refs == 0:
+            return None
+        return CacheStats(
+            level="Overall",
+            loads=refs,
+            load_misses=self._stats_dict.get("cache-misses", 0),
+            stores=0,
+            store_misses=0
+        )
+    
+    @cached_property
+    def cache_stats(self) -> list[CacheStats]:
+        """All reported cache levels, built on first access."""
+        return [s for s in (self.l1d, self.llc, self.overall) if s is not None]
+    
     @property
     def branch_miss_rate(self) -> float:
         """Calculate branch miss rate as percentage."""
@@ -65,37 +155,153 @@ class CacheAnalyzer:
     Usage:
         analyzer = CacheAnalyzer()
         result = analyzer.analyze("./my_binary")
+    
+    For repeated analyses, a long-lived perf stat daemon can be reused so
+    counters are opened once rather than on every call:
+    
+        with CacheAnalyzer() as analyzer:
+            for binary in binaries:
+                result = analyzer.analyze(binary)
     """
     
-    CACHE_EVENTS = [
-        "cycles",
-        "instructions",
-        "cache-references",
-        "cache-misses",
-        "L1-dcache-loads",
-        "L1-dcache-load-misses",
-        "L1-dcache-stores",
-        "L1-icache-load-misses",
-        "LLC-loads",
-        "LLC-load-misses",
-        "LLC-stores",
-        "LLC-store-misses",
-        "branch-instructions",
-        "branch-misses",
+    # Hardware events in one {} group are scheduled onto the PMU together,
+    # so ratios within a group are not skewed by multiplexing. Each group
+    # fits in the four general-purpose counters most cores provide.
+    CACHE_EVENT_GROUPS = [
+        ["cycles", "instructions", "branch-instructions", "branch-misses"],
+        ["cache-references", "cache-misses"],
+        ["L1-dcache-loads", "L1-dcache-load-misses", "L1-dcache-stores", "L1-icache-load-misses"],
+        ["LLC-loads", "LLC-load-misses", "LLC-stores", "LLC-store-misses"],
     ]
     
+    # perf tool events; always available and cannot join a hardware group
+    TOOL_EVENTS = ["duration_time", "user_time", "system_time"]
+    
+    # Interval for the daemon's own periodic prints; counts are normally
+    # flushed by enable/disable commands well before it elapses
+    DAEMON_INTERVAL_MS = 3_600_000
+    
+    # Seconds to wait for the daemon to acknowledge a control command
+    DAEMON_ACK_TIMEOUT = 10
+    
     def __init__(self) -> None:
-        self._perf_path: Optional[str] = shutil.which("perf")
+        self._perf_path: Optional[str] = find_tool("perf")
+        self._daemon: Optional[subprocess.Popen] = None
+        self._daemon_ctl_fd = -1
+        self._daemon_ack_fd = -1
+        self._daemon_output = ""
+        # One enable/run/disable window at a time: concurrent analyses
+        # would otherwise read each other's counts
+        self._daemon_lock = threading.Lock()
+    
+    def __enter__(self) -> "CacheAnalyzer":
+        self.start_daemon()
+        return self
+    
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop_daemon()
     
     def is_available(self) -> bool:
         """Check if perf is installed and accessible."""
         return self._perf_path is not None
     
+    def start_daemon(self) -> None:
+        """
+        Start a system-wide perf stat process driven through --control fds.
+        
+        The daemon opens all counters once and starts disabled; each
+        analyze() call enables them around the target run and reads back
+        the counts printed for that window. Counting is system-wide (-a), so
+        other activity on the machine during the window is included.
+        
+        Raises:
+            RuntimeError: If perf is not installed
+        """
+        if self._daemon is not None:
+            return
+        if not self.is_available():
+            raise RuntimeError("perf is not installed")
+        
+        ctl_read, ctl_write = os.pipe()
+        ack_read, ack_write = os.pipe()
+        out_fd, self._daemon_output = tempfile.mkstemp(prefix="perf-lens-", suffix=".csv")
+        os.close(out_fd)
+        
+        cmd = [
+            self._perf_path,
+            "stat",
+            "-a",
+            "-x,",
+            "-I", str(self.DAEMON_INTERVAL_MS),
+            "--delay=-1",  # Start with counters disabled
+            "--control", f"fd:{ctl_read},{ack_write}",
+            "-o", self._daemon_output,
+            "-e", self._event_spec(include_tool_events=False)
+        ]
+        try:
+            self._daemon = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=(ctl_read, ack_write)
+            )
+        except Exception:
+            for fd in (ctl_read, ctl_write, ack_read, ack_write):
+                os.close(fd)
+            os.unlink(self._daemon_output)
+            raise
+        finally:
+            if self._daemon is not None:
+                os.close(ctl_read)
+                os.close(ack_write)
+        
+        self._daemon_ctl_fd = ctl_write
+        self._daemon_ack_fd = ack_read
+    
+    def stop_daemon(self) -> None:
+        """Stop the perf stat daemon started by start_daemon(), if any."""
+        if self._daemon is None:
+            return
+        
+        self._daemon.send_signal(signal.SIGINT)
+        try:
+            self._daemon.wait(timeout=self.DAEMON_ACK_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self._daemon.kill()
+            self._daemon.wait()
+        
+        os.close(self._daemon_ctl_fd)
+        os.close(self._daemon_ack_fd)
+        os.unlink(self._daemon_output)
+        self._daemon = None
+    
+    def _daemon_command(self, command: str) -> None:
+        """Send a control command to the daemon and wait for its ack."""
+        try:
+            os.write(self._daemon_ctl_fd, command.encode() + b"\n")
+        except BrokenPipeError:
+            raise RuntimeError("perf stat daemon is no longer running") from None
+        ready, _, _ = select.select([self._daemon_ack_fd], [], [], self.DAEMON_ACK_TIMEOUT)
+        if not ready or not os.read(self._daemon_ack_fd, 16).startswith(b"ack"):
+            raise RuntimeError(f"perf stat daemon did not acknowledge '{command}'")
+    
+    def _daemon_sync(self, command: str) -> None:
+        """
+        Run a control command and wait until its output has been written.
+        
+        perf acks a command before printing the counts it triggers; a
+        following ping is only handled once that print has completed.
+        """
+        self._daemon_command(command)
+        self._daemon_command("ping")
+    
     def analyze(
         self,
         binary_path: str,
         args: Optional[list[str]] = None,
-        timeout: int = 300
+        timeout: int = 300,
+        keep_raw: bool = False,
+        parse: bool = True
     ) -> CacheAnalysisResult:
         """
         Run cache performance analysis on the specified binary.
@@ -104,18 +310,38 @@ class CacheAnalyzer:
             binary_path: Path to the executable to analyze
             args: Optional command-line arguments to pass to the binary
             timeout: Maximum execution time in seconds
+            keep_raw: Keep the tool output in raw_output (default: False)
+            parse: Parse the tool output; when False only raw_output is
+                filled in (default: True)
             
         Returns:
             CacheAnalysisResult containing cache statistics
         """
+        return run_coroutine(
+            self.analyze_async(binary_path, args, timeout, keep_raw, parse)
+        )
+    
+    async def analyze_async(
+        self,
+        binary_path: str,
+        args: Optional[list[str]] = None,
+        timeout: int = 300,
+        keep_raw: bool = False,
+        parse: bool = True
+    ) -> CacheAnalysisResult:
+        """
+        Asynchronous variant of analyze().
+        
+        perf stat runs as an asyncio subprocess, so several analyses can
+        overlap in one event loop (see run_all()).
+        """
         if not self.is_available():
             return CacheAnalysisResult(
                 binary_path=binary_path,
                 duration_seconds=0,
                 total_cycles=0,
                 total_instructions=0,
-                ipc=0,
-                cache_stats=[],
+                _stats_dict={},
                 branch_misses=0,
                 branch_total=0,
                 raw_output="",
@@ -129,43 +355,139 @@ class CacheAnalyzer:
                 duration_seconds=0,
                 total_cycles=0,
                 total_instructions=0,
-                ipc=0,
-                cache_stats=[],
+                _stats_dict={},
                 branch_misses=0,
                 branch_total=0,
                 raw_output="",
                 error=f"Binary not found: {binary_path}"
             )
         
+        if self._daemon is not None:
+            return await asyncio.to_thread(
+                self._analyze_with_daemon, binary_path, args, timeout, keep_raw, parse
+            )
+        
         # Build perf stat command
-        events = ",".join(self.CACHE_EVENTS)
+        events = self._event_spec()
         cmd = [
             self._perf_path,
             "stat",
+            "-x,",  # CSV output: count,unit,event,...
             "-e", events,
-            str(binary.absolute())
+            "--", str(binary.absolute())
         ]
         if args:
             cmd.extend(args)
         
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout
+            # perf stat outputs to stderr; spool it to a temp file as raw bytes
+            # rather than buffering and decoding it through a pipe
+            with tempfile.TemporaryFile() as errf:
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=subprocess.DEVNULL,
+                    stderr=errf
+                )
+                try:
+                    await asyncio.wait_for(proc.wait(), timeout)
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+                    raise
+                errf.seek(0)
+                output = errf.read()
+            if not parse:
+                return self._build_result(binary_path, {}, 0, output, keep_raw=True)
+            return self._parse_output(binary_path, output, keep_raw)
+        except asyncio.TimeoutError:
+            return CacheAnalysisResult(
+                binary_path=binary_path,
+                duration_seconds=0,
+                total_cycles=0,
+                total_instructions=0,
+                _stats_dict={},
+                branch_misses=0,
+                branch_total=0,
+                raw_output="",
+                error=f"Analysis timed out after {timeout} seconds"
             )
-            # perf stat outputs to stderr
-            output = result.stderr
-            return self._parse_output(binary_path, output)
+        except Exception as e:
+            return CacheAnalysisResult(
+                binary_path=binary_path,
+                duration_seconds=0,
+                total_cycles=0,
+                total_instructions=0,
+                _stats_dict={},
+                branch_misses=0,
+                branch_total=0,
+                raw_output="",
+                error=str(e)
+            )
+    
+    def _event_spec(self, include_tool_events: bool = True) -> str:
+        """
+        Build the perf stat -e argument from the events this CPU supports.
+        
+        Asking perf for an unsupported counter wastes a counter slot and can
+        fail the whole measurement, so those events are dropped from their
+        group up front; groups left empty are omitted.
+        """
+        supported = _supported_events(self._perf_path)
+        groups = []
+        for group in self.CACHE_EVENT_GROUPS:
+            if supported:
+                group = [
+                    event for event in group
+                    if event in supported or _EVENT_ALIASES.get(event) in supported
+                ]
+            if group:
+                groups.append("{" + ",".join(group) + "}")
+        if include_tool_events:
+            groups.extend(self.TOOL_EVENTS)
+        return ",".join(groups)
+    
+    def _analyze_with_daemon(
+        self,
+        binary_path: str,
+        args: Optional[list[str]],
+        timeout: int,
+        keep_raw: bool,
+        parse: bool = True
+    ) -> CacheAnalysisResult:
+        """Run the binary with the daemon's counters enabled around it."""
+        cmd = [str(Path(binary_path).absolute())]
+        if args:
+            cmd.extend(args)
+        
+        try:
+            with self._daemon_lock:
+                self._daemon_sync("enable")
+                start_offset = os.path.getsize(self._daemon_output)
+                start_time = time.perf_counter()
+                try:
+                    subprocess.run(
+                        cmd,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                        timeout=timeout
+                    )
+                finally:
+                    duration = time.perf_counter() - start_time
+                    self._daemon_sync("disable")
+                
+                with open(self._daemon_output, "rb") as f:
+                    f.seek(start_offset)
+                    output = f.read()
+            if not parse:
+                return self._build_result(binary_path, {}, duration, output, keep_raw=True)
+            return self._parse_daemon_output(binary_path, output, duration, keep_raw)
         except subprocess.TimeoutExpired:
             return CacheAnalysisResult(
                 binary_path=binary_path,
                 duration_seconds=0,
                 total_cycles=0,
                 total_instructions=0,
-                ipc=0,
-                cache_stats=[],
+                _stats_dict={},
                 branch_misses=0,
                 branch_total=0,
                 raw_output="",
@@ -177,96 +499,59 @@ class CacheAnalyzer:
                 duration_seconds=0,
                 total_cycles=0,
                 total_instructions=0,
-                ipc=0,
-                cache_stats=[],
+                _stats_dict={},
                 branch_misses=0,
                 branch_total=0,
                 raw_output="",
                 error=str(e)
             )
     
-    def _parse_output(self, binary_path: str, output: str) -> CacheAnalysisResult:
+    def _parse_output(
+        self,
+        binary_path: str,
+        output: bytes,
+        keep_raw: bool = False
+    ) -> CacheAnalysisResult:
         """Parse perf stat output and extract cache statistics."""
-        stats: dict[str, int] = {}
-        duration = 0.0
+        # Parse CSV records like "4282,,cache-misses:u,1000,100.00,,"
+        stats = _fastparse.parse_cache(output)
         
-        # Parse each line for event counts
-        for line in output.split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Parse duration
-            duration_match = re.search(r"([\d.]+)\s+seconds time elapsed", line)
-            if duration_match:
-                duration = float(duration_match.group(1))
-                continue
-            
-            # Parse event counts like "1,234,567 cache-misses"
-            count_match = re.match(r"([\d,]+)\s+(\S+)", line)
-            if count_match:
-                count_str = count_match.group(1).replace(",", "")
-                event_name = count_match.group(2)
-                try:
-                    stats[event_name] = int(count_str)
-                except ValueError:
-                    pass
-        
-        # Extract values
-        cycles = stats.get("cycles", 0)
-        instructions = stats.get("instructions", 0)
-        ipc = instructions / cycles if cycles > 0 else 0
-        
-        # Build cache stats
-        cache_stats = []
-        
-        # L1 Data Cache
-        l1d_loads = stats.get("L1-dcache-loads", 0)
-        l1d_misses = stats.get("L1-dcache-load-misses", 0)
-        l1d_stores = stats.get("L1-dcache-stores", 0)
-        if l1d_loads > 0 or l1d_misses > 0:
-            cache_stats.append(CacheStats(
-                level="L1-Data",
-                loads=l1d_loads,
-                load_misses=l1d_misses,
-                stores=l1d_stores,
-                store_misses=0
-            ))
-        
-        # LLC (Last Level Cache, usually L3)
-        llc_loads = stats.get("LLC-loads", 0)
-        llc_load_misses = stats.get("LLC-load-misses", 0)
-        llc_stores = stats.get("LLC-stores", 0)
-        llc_store_misses = stats.get("LLC-store-misses", 0)
-        if llc_loads > 0 or llc_stores > 0:
-            cache_stats.append(CacheStats(
-                level="LLC (L3)",
-                loads=llc_loads,
-                load_misses=llc_load_misses,
-                stores=llc_stores,
-                store_misses=llc_store_misses
-            ))
-        
-        # Overall cache (generic)
-        cache_refs = stats.get("cache-references", 0)
-        cache_misses = stats.get("cache-misses", 0)
-        if cache_refs > 0:
-            cache_stats.append(CacheStats(
-                level="Overall",
-                loads=cache_refs,
-                load_misses=cache_misses,
-                stores=0,
-                store_misses=0
-            ))
+        # duration_time is reported in nanoseconds
+        duration = stats.get("duration_time", 0) / 1e9
         
+        return self._build_result(binary_path, stats, duration, output, keep_raw)
+    
+    def _parse_daemon_output(
+        self,
+        binary_path: str,
+        output: bytes,
+        duration: float,
+        keep_raw: bool = False
+    ) -> CacheAnalysisResult:
+        """Parse the interval records the daemon printed for one run."""
+        # Parse CSV records like "12.001,4282,,cache-misses,1000,100.00,,"
+        stats = _fastparse.parse_cache_intervals(output)
+        return self._build_result(binary_path, stats, duration, output, keep_raw)
+    
+    def _build_result(
+        self,
+        binary_path: str,
+        stats: dict[str, int],
+        duration: float,
+        output: bytes,
+        keep_raw: bool
+    ) -> CacheAnalysisResult:
+        """Wrap parsed event counts in a CacheAnalysisResult."""
         return CacheAnalysisResult(
             binary_path=binary_path,
             duration_seconds=duration,
-            total_cycles=cycles,
-            total_instructions=instructions,
-            ipc=ipc,
-            cache_stats=cache_stats,
+            total_cycles=stats.get("cycles", 0),
+            total_instructions=stats.get("instructions", 0),
+            _stats_dict=stats,
             branch_misses=stats.get("branch-misses", 0),
             branch_total=stats.get("branch-instructions", 0),
-            raw_output=output
+            raw_output=(
+                output[-_RAW_OUTPUT_TAIL:].decode("utf-8", errors="replace")
+                if keep_raw else ""
+            )
         )
@@ -4,14 +4,20 @@ CPU Profiler and Flame Graph Generator using perf.
 Wraps perf record/script and flamegraph.pl to generate flame graphs.
 """
 
+import asyncio
+import contextlib
 import os
 import subprocess
-import shutil
+import sys
 import tempfile
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+from .. import _fastparse
+from ._tools import find_flamegraph_script, find_tool, run_coroutine
+
 
 @dataclass
 class HotspotInfo:
@@ -44,33 +50,8 @@ class CPUAnalyzer:
     """
     
     def __init__(self) -> None:
-        self._perf_path: Optional[str] = shutil.which("perf")
-        self._flamegraph_script = self._find_flamegraph_script()
-    
-    def _find_flamegraph_script(self) -> Optional[str]:
-        """Find flamegraph.pl script in common locations."""
-        # Check bundled resource first
-        package_dir = Path(__file__).parent.parent
-        bundled = package_dir / "resources" / "flamegraph.pl"
-        if bundled.exists():
-            return str(bundled)
-        
-        # Check system path
-        system_path = shutil.which("flamegraph.pl")
-        if system_path:
-            return system_path
-        
-        # Check common installation locations
-        common_paths = [
-            Path.home() / "FlameGraph" / "flamegraph.pl",
-            Path("/usr/local/bin/flamegraph.pl"),
-            Path("/opt/FlameGraph/flamegraph.pl"),
-        ]
-        for path in common_paths:
-            if path.exists():
-                return str(path)
-        
-        return None
+        self._perf_path: Optional[str] = find_tool("perf")
+        self._flamegraph_script = find_flamegraph_script()
     
     def is_available(self) -> bool:
         """Check if perf is installed and accessible."""
@@ -86,7 +67,8 @@ class CPUAnalyzer:
         args: Optional[list[str]] = None,
         duration: int = 30,
         output_dir: Optional[str] = None,
-        frequency: int = 99
+        frequency: int = 99,
+        keep_raw: bool = False
     ) -> CPUAnalysisResult:
         """
         Run CPU profiling on the specified binary.
@@ -97,10 +79,33 @@ class CPUAnalyzer:
             duration: Profiling duration in seconds (default: 30)
             output_dir: Directory for output files (default: current directory)
             frequency: Sampling frequency in Hz (default: 99)
+            keep_raw: Keep the perf report listing in raw_output (default: False)
             
         Returns:
             CPUAnalysisResult containing profiling information
         """
+        return run_coroutine(
+            self.analyze_async(
+                binary_path, args, duration, output_dir, frequency, keep_raw
+            )
+        )
+    
+    async def analyze_async(
+        self,
+        binary_path: str,
+        args: Optional[list[str]] = None,
+        duration: int = 30,
+        output_dir: Optional[str] = None,
+        frequency: int = 99,
+        keep_raw: bool = False
+    ) -> CPUAnalysisResult:
+        """
+        Asynchronous variant of analyze().
+        
+        perf record runs as an asyncio subprocess and perf.data is processed
+        in a worker thread, so several analyses can overlap in one event loop
+        (see run_all()).
+        """
         if not self.is_available():
             return CPUAnalysisResult(
                 binary_path=binary_path,
@@ -126,44 +131,52 @@ class CPUAnalyzer:
         
         output_path = Path(output_dir) if output_dir else Path.cwd()
         output_path.mkdir(parents=True, exist_ok=True)
+        perf_data = output_path / "perf.data"
         
         try:
             # Step 1: Record perf data
-            perf_data = output_path / "perf.data"
-            record_result = self._record(binary, args, duration, frequency, perf_data)
-            if record_result.returncode != 0:
+            returncode, record_stderr = await self._record(
+                binary, args, duration, frequency, perf_data
+            )
+            if returncode != 0:
                 return CPUAnalysisResult(
                     binary_path=binary_path,
                     duration_seconds=duration,
                     total_samples=0,
                     hotspots=[],
                     flamegraph_path=None,
-                    raw_output=record_result.stderr,
-                    error=f"perf record failed: {record_result.stderr}"
+                    raw_output=record_stderr if keep_raw else "",
+                    error=f"perf record failed: {record_stderr}"
                 )
             
-            # Step 2: Generate report for hotspots
-            hotspots, total_samples, report_output = self._generate_report(perf_data)
-            
-            # Step 3: Generate flame graph if flamegraph.pl is available
-            flamegraph_path = None
+            # Step 2: Extract hotspots and the flame graph (if flamegraph.pl
+            # is available) from a single perf script pass
+            svg_path = None
             if self.has_flamegraph():
                 svg_path = output_path / f"{binary.stem}_flamegraph.svg"
-                flamegraph_path = self._generate_flamegraph(perf_data, svg_path)
-            
-            # Cleanup perf.data
-            if perf_data.exists():
-                perf_data.unlink()
+            hotspots, total_samples, report_output, flamegraph_path = (
+                await asyncio.to_thread(self._process_perf_data, perf_data, svg_path)
+            )
             
             return CPUAnalysisResult(
                 binary_path=binary_path,
                 duration_seconds=duration,
                 total_samples=total_samples,
-                hotspots=hotspots[:10],  # Top 10 hotspots
+                hotspots=hotspots,
                 flamegraph_path=flamegraph_path,
-                raw_output=report_output
+                raw_output=report_output if keep_raw else ""
             )
             
+        except asyncio.TimeoutError:
+            return CPUAnalysisResult(
+                binary_path=binary_path,
+                duration_seconds=0,
+                total_samples=0,
+                hotspots=[],
+                flamegraph_path=None,
+                raw_output="",
+                error=f"perf record timed out after {duration + 60} seconds"
+            )
         except Exception as e:
             return CPUAnalysisResult(
                 binary_path=binary_path,
@@ -174,129 +187,180 @@ class CPUAnalyzer:
                 raw_output="",
                 error=str(e)
             )
+        finally:
+            # Cleanup perf.data, whether or not the analysis succeeded
+            perf_data.unlink(missing_ok=True)
     
-    def _record(
+    async def _record(
         self,
         binary: Path,
         args: Optional[list[str]],
         duration: int,
         frequency: int,
         output_file: Path
-    ) -> subprocess.CompletedProcess:
-        """Run perf record on the binary."""
+    ) -> tuple[int, str]:
+        """Run perf record on the binary and return (returncode, stderr)."""
         cmd = [
             self._perf_path,
             "record",
             "-F", str(frequency),
             "-g",  # Enable call graph
+            "--max-size", "256M",  # Cap perf.data so post-processing stays bounded
             "-o", str(output_file),
             "--", str(binary.absolute())
         ]
         if args:
             cmd.extend(args)
         
-        return subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=duration + 60  # Extra buffer for startup/shutdown
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
         )
+        try:
+            # Extra buffer for startup/shutdown
+            _, stderr = await asyncio.wait_for(proc.communicate(), duration + 60)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        return proc.returncode, stderr.decode("utf-8", errors="replace")
     
-    def _generate_report(self, perf_data: Path) -> tuple[list[HotspotInfo], int, str]:
-        """Generate perf report and extract hotspots."""
-        cmd = [
-            self._perf_path,
-            "report",
-            "-i", str(perf_data),
-            "--stdio",
-            "--sort", "overhead,sym",
-            "-n"  # Show sample counts
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        output = result.stdout
+    def _process_perf_data(
+        self,
+        perf_data: Path,
+        output_svg: Optional[Path]
+    ) -> tuple[list[HotspotInfo], int, str, Optional[str]]:
+        """
+        Extract hotspots and, optionally, a flame graph from one perf script pass.
         
-        hotspots: list[HotspotInfo] = []
-        total_samples = 0
+        perf.data is symbolized once; every line of the perf script stream is
+        forwarded to stackcollapse-perf.pl while the leaf frame of each sample
+        is counted here to rank hotspots.
         
-        for line in output.split("\n"):
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            
-            # Parse lines like: "  10.50%   1234  binary  [.] function_name"
-            parts = line.split()
-            if len(parts) >= 5 and "%" in parts[0]:
-                try:
-                    overhead = float(parts[0].replace("%", ""))
-                    samples = int(parts[1])
-                    module = parts[2]
-                    # Find function name (after [.] or [k])
-                    func_idx = -1
-                    for i, p in enumerate(parts):
-                        if p in ("[.]", "[k]"):
-                            func_idx = i + 1
-                            break
-                    
-                    if func_idx > 0 and func_idx < len(parts):
-                        func_name = " ".join(parts[func_idx:])
-                        hotspots.append(HotspotInfo(
-                            function_name=func_name,
-                            overhead_percent=overhead,
-                            samples=samples,
-                            module=module
-                        ))
-                        total_samples += samples
-                except (ValueError, IndexError):
-                    continue
+        Returns:
+            (top hotspots, total samples, text report, flame graph path)
+        """
+        script_proc = subprocess.Popen(
+            [self._perf_path, "script", "-i", str(perf_data)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
         
-        return hotspots, total_samples, output
-    
-    def _generate_flamegraph(self, perf_data: Path, output_svg: Path) -> Optional[str]:
-        """Generate flame graph SVG from perf data."""
+        flamegraph_procs = None
+        finished = False
         try:
-            # perf script | stackcollapse-perf.pl | flamegraph.pl > output.svg
-            script_result = subprocess.run(
-                [self._perf_path, "script", "-i", str(perf_data)],
-                capture_output=True,
-                text=True
-            )
-            
-            if script_result.returncode != 0:
-                return None
+            if output_svg is not None:
+                flamegraph_procs = self._start_flamegraph(output_svg)
+            feed = flamegraph_procs[0].stdin if flamegraph_procs else None
             
-            # Find stackcollapse-perf.pl
-            flamegraph_dir = Path(self._flamegraph_script).parent
-            stackcollapse = flamegraph_dir / "stackcollapse-perf.pl"
+            counts: Counter[tuple[str, str]] = Counter()
+            total_samples = 0
+            leaf_pending = False
             
-            if not stackcollapse.exists():
-                # Try without stackcollapse (some setups)
-                return None
-            
-            # Collapse stacks
-            collapse_result = subprocess.run(
-                ["perl", str(stackcollapse)],
-                input=script_result.stdout,
-                capture_output=True,
-                text=True
-            )
+            for line in script_proc.stdout:
+                if feed is not None:
+                    try:
+                        feed.write(line)
+                    except BrokenPipeError:
+                        feed = None
+                
+                # Samples are a header line followed by indented call chain frames:
+                #   app 1234 56.789: 10101 cycles:u:
+                #       55d0c4a1b2c3 compute+0x1f (/path/to/app)
+                if line[:1] in (b"\t", b" "):
+                    if leaf_pending:
+                        counts[_fastparse.parse_perf_frame(line)] += 1
+                        total_samples += 1
+                        leaf_pending = False
+                elif line.strip():
+                    leaf_pending = True
             
-            if collapse_result.returncode != 0:
-                return None
+            script_proc.stdout.close()
+            script_ok = script_proc.wait() == 0
             
-            # Generate flame graph
-            flamegraph_result = subprocess.run(
-                ["perl", self._flamegraph_script, "--title", "CPU Flame Graph"],
-                input=collapse_result.stdout,
-                capture_output=True,
-                text=True
+            flamegraph_path = None
+            if flamegraph_procs:
+                collapse_proc, flamegraph_proc = flamegraph_procs
+                try:
+                    collapse_proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+                returncodes = (flamegraph_proc.wait(), collapse_proc.wait())
+                if script_ok and all(code == 0 for code in returncodes):
+                    flamegraph_path = str(output_svg)
+                else:
+                    output_svg.unlink(missing_ok=True)
+            finished = True
+        finally:
+            if not finished:
+                # Parsing failed part-way: reap the whole pipeline and drop
+                # the partial flame graph
+                procs = [script_proc, *(flamegraph_procs or ())]
+                for proc in procs:
+                    proc.kill()
+                for proc in procs:
+                    for pipe in (proc.stdin, proc.stdout):
+                        if pipe is not None:
+                            with contextlib.suppress(OSError):
+                                pipe.close()
+                    proc.wait()
+                if output_svg is not None:
+                    output_svg.unlink(missing_ok=True)
+        
+        hotspots = [
+            HotspotInfo(
+                function_name=sys.intern(function_name),
+                overhead_percent=samples * 100 / total_samples,
+                samples=samples,
+                module=sys.intern(module)
             )
-            
-            if flamegraph_result.returncode == 0:
-                output_svg.write_text(flamegraph_result.stdout)
-                return str(output_svg)
-            
+            for (function_name, module), samples in counts.most_common()
+        ]
+        report_output = "\n".join(
+            f"{h.overhead_percent:6.2f}%  {h.samples:>8}  {h.module}  {h.function_name}"
+            for h in hotspots
+        )
+        
+        # Top 10 hotspots
+        return hotspots[:10], total_samples, report_output, flamegraph_path
+    
+    def _start_flamegraph(
+        self,
+        output_svg: Path
+    ) -> Optional[tuple[subprocess.Popen, subprocess.Popen]]:
+        """Start the stackcollapse-perf.pl | flamegraph.pl > output.svg chain."""
+        # Find stackcollapse-perf.pl
+        flamegraph_dir = Path(self._flamegraph_script).parent
+        stackcollapse = flamegraph_dir / "stackcollapse-perf.pl"
+        
+        if not stackcollapse.exists():
+            # Try without stackcollapse (some setups)
             return None
-            
+        
+        collapse_proc = None
+        try:
+            with output_svg.open("wb") as svg_file:
+                collapse_proc = subprocess.Popen(
+                    ["perl", str(stackcollapse)],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
+                )
+                flamegraph_proc = subprocess.Popen(
+                    ["perl", self._flamegraph_script, "--title", "CPU Flame Graph"],
+                    stdin=collapse_proc.stdout,
+                    stdout=svg_file,
+                    stderr=subprocess.DEVNULL
+                )
+            collapse_proc.stdout.close()
+            return collapse_proc, flamegraph_proc
         except Exception:
+            # Don't leave a half-started chain running or a partial SVG behind
+            if collapse_proc is not None:
+                collapse_proc.kill()
+                collapse_proc.stdin.close()
+                collapse_proc.stdout.close()
+                collapse_proc.wait()
+            output_svg.unlink(missing_ok=True)
             return None
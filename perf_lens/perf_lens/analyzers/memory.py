@@ -2,15 +2,60 @@
 Memory Leak Analyzer using Valgrind.
 
 Wraps valgrind --leak-check=full to detect and report memory leaks.
+Binaries built with -fsanitize=address or -fsanitize=leak are run directly
+under LeakSanitizer instead, which is far cheaper than Valgrind.
 """
 
+import functools
+import heapq
+import os
 import re
 import subprocess
-import shutil
 from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
 from typing import Optional
 
+from .. import _fastparse
+from ._tools import find_tool, run_tool
+
+
+# Only the tail of the tool output is kept in raw_output
+_RAW_OUTPUT_TAIL = 64 * 1024
+
+# Leak summary lines, searched once each over the full Valgrind log
+_DEF_LOST_RE = re.compile(rb"definitely lost: ([\d,]+) bytes")
+_IND_LOST_RE = re.compile(rb"indirectly lost: ([\d,]+) bytes")
+_POS_LOST_RE = re.compile(rb"possibly lost: ([\d,]+) bytes")
+_REACH_RE = re.compile(rb"still reachable: ([\d,]+) bytes")
+
+# Signs of a sanitizer runtime in "readelf --dynamic --dyn-syms" output: a
+# NEEDED entry for the shared runtime (GCC) or one of its symbols (Clang
+# links the runtime statically)
+_SANITIZER_MARKERS = (b"[libasan.so", b"[liblsan.so", b"__asan_init", b"__lsan_")
+
+
+@functools.lru_cache(maxsize=64)
+def _has_sanitizer_runtime(path: str, mtime_ns: int) -> bool:
+    """Check a binary for a LeakSanitizer-capable runtime; cached per file version."""
+    readelf_path = find_tool("readelf")
+    if readelf_path is None:
+        return False
+    try:
+        result = subprocess.run(
+            [readelf_path, "--dynamic", "--dyn-syms", "--wide", path],
+            capture_output=True,
+            timeout=30
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return any(marker in result.stdout for marker in _SANITIZER_MARKERS)
+
+
+def _join_options(*options: Optional[str]) -> str:
+    """Join sanitizer option strings with ":", skipping unset ones."""
+    return ":".join(option for option in options if option)
+
 
 @dataclass
 class MemoryLeak:
@@ -44,18 +89,42 @@ class MemoryAnalyzer:
         result = analyzer.analyze("./my_binary", args=["arg1", "arg2"])
     """
     
+    # Memcheck options placed before the binary
+    MEMCHECK_ARGS = (
+        "--leak-check=full",
+        "--show-leak-kinds=all",
+        "--track-origins=yes",
+        "--verbose",
+        "--num-callers=12",  # Bound stack depth per leak record
+        "--max-stackframe=8388608",  # Treat SP jumps up to 8MB as big frames, not stack switches
+    )
+    
     def __init__(self) -> None:
-        self._valgrind_path: Optional[str] = shutil.which("valgrind")
+        self._valgrind_path: Optional[str] = find_tool("valgrind")
     
-    def is_available(self) -> bool:
-        """Check if Valgrind is installed and accessible."""
-        return self._valgrind_path is not None
+    def is_available(self, binary_path: Optional[str] = None) -> bool:
+        """
+        Check if memory analysis can run.
+        
+        Args:
+            binary_path: Binary to be analyzed; sanitizer-instrumented
+                binaries run under LeakSanitizer and don't need Valgrind
+            
+        Returns:
+            True if Valgrind is installed, or binary_path carries a
+            LeakSanitizer runtime
+        """
+        if self._valgrind_path is not None:
+            return True
+        return binary_path is not None and self._has_lsan(Path(binary_path))
     
     def analyze(
         self,
         binary_path: str,
         args: Optional[list[str]] = None,
-        timeout: int = 300
+        timeout: int = 300,
+        keep_raw: bool = False,
+        parse: bool = True
     ) -> MemoryAnalysisResult:
         """
         Run memory leak analysis on the specified binary.
@@ -64,11 +133,15 @@ class MemoryAnalyzer:
             binary_path: Path to the executable to analyze
             args: Optional command-line arguments to pass to the binary
             timeout: Maximum execution time in seconds (default: 5 minutes)
+            keep_raw: Keep the tool output in raw_output (default: False)
+            parse: Parse the tool output; when False only raw_output is
+                filled in (default: True)
             
         Returns:
             MemoryAnalysisResult containing leak information
         """
-        if not self.is_available():
+        binary = Path(binary_path)
+        if not binary.exists():
             return MemoryAnalysisResult(
                 binary_path=binary_path,
                 total_leaks=0,
@@ -78,11 +151,11 @@ class MemoryAnalyzer:
                 still_reachable_bytes=0,
                 leaks=[],
                 raw_output="",
-                error="Valgrind is not installed. Install with: sudo apt install valgrind"
+                error=f"Binary not found: {binary_path}"
             )
         
-        binary = Path(binary_path)
-        if not binary.exists():
+        use_lsan = self._has_lsan(binary)
+        if not use_lsan and not self.is_available():
             return MemoryAnalysisResult(
                 binary_path=binary_path,
                 total_leaks=0,
@@ -92,32 +165,33 @@ class MemoryAnalyzer:
                 still_reachable_bytes=0,
                 leaks=[],
                 raw_output="",
-                error=f"Binary not found: {binary_path}"
+                error="Valgrind is not installed. Install with: sudo apt install valgrind"
             )
         
-        # Build valgrind command
-        cmd = [
-            self._valgrind_path,
-            "--leak-check=full",
-            "--show-leak-kinds=all",
-            "--track-origins=yes",
-            "--verbose",
-            str(binary.absolute())
-        ]
+        env = None
+        if use_lsan:
+            # Sanitizer-instrumented binary: run it directly with leak
+            # detection enabled instead of under Valgrind. The user's own
+            # options are kept; later options win, so leak detection can't
+            # be turned off while our print_suppressions default can be
+            cmd = [str(binary.absolute())]
+            env = {
+                **os.environ,
+                "LSAN_OPTIONS": _join_options(
+                    "print_suppressions=0", os.environ.get("LSAN_OPTIONS")
+                ),
+                "ASAN_OPTIONS": _join_options(
+                    os.environ.get("ASAN_OPTIONS"), "detect_leaks=1"
+                ),
+            }
+        else:
+            # Build valgrind command
+            cmd = [self._valgrind_path, *self.MEMCHECK_ARGS, str(binary.absolute())]
         if args:
             cmd.extend(args)
         
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
-            # Valgrind outputs to stderr
-            output = result.stderr
-            return self._parse_output(binary_path, output)
-        except subprocess.TimeoutExpired:
+        output, error = run_tool(cmd, timeout, env=env)
+        if error is not None:
             return MemoryAnalysisResult(
                 binary_path=binary_path,
                 total_leaks=0,
@@ -127,9 +201,10 @@ class MemoryAnalyzer:
                 still_reachable_bytes=0,
                 leaks=[],
                 raw_output="",
-                error=f"Analysis timed out after {timeout} seconds"
+                error=error
             )
-        except Exception as e:
+        
+        if not parse:
             return MemoryAnalysisResult(
                 binary_path=binary_path,
                 total_leaks=0,
@@ -138,51 +213,40 @@ class MemoryAnalyzer:
                 possibly_lost_bytes=0,
                 still_reachable_bytes=0,
                 leaks=[],
-                raw_output="",
-                error=str(e)
+                raw_output=output[-_RAW_OUTPUT_TAIL:].decode("utf-8", errors="replace")
             )
+        
+        # Valgrind/LSan report on stderr
+        if use_lsan:
+            return self._parse_lsan_output(binary_path, output, keep_raw)
+        return self._parse_output(binary_path, output, keep_raw)
     
-    def _parse_output(self, binary_path: str, output: str) -> MemoryAnalysisResult:
+    def _has_lsan(self, binary: Path) -> bool:
+        """Check whether the binary carries the LeakSanitizer runtime (ASan or LSan)."""
+        try:
+            mtime_ns = binary.stat().st_mtime_ns
+        except OSError:
+            return False
+        return _has_sanitizer_runtime(str(binary.absolute()), mtime_ns)
+    
+    def _parse_output(
+        self,
+        binary_path: str,
+        output: bytes,
+        keep_raw: bool = False
+    ) -> MemoryAnalysisResult:
         """Parse Valgrind output and extract leak information."""
-        leaks: list[MemoryLeak] = []
-        
         # Parse leak summary
-        definitely_lost = self._extract_bytes(output, r"definitely lost: ([\d,]+) bytes")
-        indirectly_lost = self._extract_bytes(output, r"indirectly lost: ([\d,]+) bytes")
-        possibly_lost = self._extract_bytes(output, r"possibly lost: ([\d,]+) bytes")
-        still_reachable = self._extract_bytes(output, r"still reachable: ([\d,]+) bytes")
+        definitely_lost = self._extract_bytes(output, _DEF_LOST_RE)
+        indirectly_lost = self._extract_bytes(output, _IND_LOST_RE)
+        possibly_lost = self._extract_bytes(output, _POS_LOST_RE)
+        still_reachable = self._extract_bytes(output, _REACH_RE)
         
         # Parse individual leak records
-        leak_pattern = re.compile(
-            r"([\d,]+) bytes in ([\d,]+) blocks? are (definitely|indirectly|possibly) lost.*?\n"
-            r"((?:==\d+==\s+(?:at|by).*?\n)+)",
-            re.MULTILINE | re.DOTALL
-        )
-        
-        for match in leak_pattern.finditer(output):
-            bytes_lost = int(match.group(1).replace(",", ""))
-            blocks = int(match.group(2).replace(",", ""))
-            leak_type = match.group(3) + " lost"
-            
-            # Extract stack trace
-            stack_text = match.group(4)
-            stack_lines = []
-            for line in stack_text.strip().split("\n"):
-                # Clean up the line
-                cleaned = re.sub(r"==\d+==\s+", "", line).strip()
-                if cleaned:
-                    stack_lines.append(cleaned)
-            
-            leaks.append(MemoryLeak(
-                bytes_lost=bytes_lost,
-                blocks=blocks,
-                leak_type=leak_type,
-                stack_trace=stack_lines[:10]  # Limit stack trace depth
-            ))
+        leaks = [MemoryLeak(*record) for record in _fastparse.parse_valgrind_leaks(output)]
         
-        # Sort leaks by bytes lost (descending) and take top 10
-        leaks.sort(key=lambda x: x.bytes_lost, reverse=True)
-        top_leaks = leaks[:10]
+        # Top 10 leaks by bytes lost (descending)
+        top_leaks = heapq.nlargest(10, leaks, key=attrgetter("bytes_lost"))
         
         return MemoryAnalysisResult(
             binary_path=binary_path,
@@ -192,12 +256,44 @@ class MemoryAnalyzer:
             possibly_lost_bytes=possibly_lost,
             still_reachable_bytes=still_reachable,
             leaks=top_leaks,
-            raw_output=output
+            raw_output=(
+                output[-_RAW_OUTPUT_TAIL:].decode("utf-8", errors="replace")
+                if keep_raw else ""
+            )
+        )
+    
+    def _parse_lsan_output(
+        self,
+        binary_path: str,
+        output: bytes,
+        keep_raw: bool = False
+    ) -> MemoryAnalysisResult:
+        """Parse LeakSanitizer output and extract leak information."""
+        leaks = [MemoryLeak(*record) for record in _fastparse.parse_lsan_leaks(output)]
+        lost_bytes = {"definitely lost": 0, "indirectly lost": 0}
+        for leak in leaks:
+            lost_bytes[leak.leak_type] += leak.bytes_lost
+        
+        # Top 10 leaks by bytes lost (descending)
+        top_leaks = heapq.nlargest(10, leaks, key=attrgetter("bytes_lost"))
+        
+        return MemoryAnalysisResult(
+            binary_path=binary_path,
+            total_leaks=len(leaks),
+            definitely_lost_bytes=lost_bytes["definitely lost"],
+            indirectly_lost_bytes=lost_bytes["indirectly lost"],
+            possibly_lost_bytes=0,
+            still_reachable_bytes=0,
+            leaks=top_leaks,
+            raw_output=(
+                output[-_RAW_OUTPUT_TAIL:].decode("utf-8", errors="replace")
+                if keep_raw else ""
+            )
         )
     
-    def _extract_bytes(self, text: str, pattern: str) -> int:
-        """Extract byte count from text using regex pattern."""
-        match = re.search(pattern, text)
+    def _extract_bytes(self, text: bytes, compiled: re.Pattern[bytes]) -> int:
+        """Extract byte count from text using a compiled regex pattern."""
+        match = compiled.search(text)
         if match:
-            return int(match.group(1).replace(",", ""))
+            return int(match.group(1).replace(b",", b""))
         return 0
@@ -0,0 +1,35 @@
+"""
+Concurrent execution of multiple analyzers.
+
+Each analyzer runs the target binary independently, so their tool
+invocations can overlap instead of running back to back.
+"""
+
+import asyncio
+from typing import Optional
+
+from .cache import CacheAnalysisResult, CacheAnalyzer
+from .cpu import CPUAnalysisResult, CPUAnalyzer
+
+
+async def run_all(
+    binary_path: str,
+    args: Optional[list[str]] = None
+) -> tuple[CacheAnalysisResult, CPUAnalysisResult]:
+    """
+    Run cache and CPU analysis on the binary concurrently.
+
+    Usage:
+        cache_result, cpu_result = asyncio.run(run_all("./my_binary"))
+
+    Args:
+        binary_path: Path to the executable to analyze
+        args: Optional command-line arguments to pass to the binary
+
+    Returns:
+        Tuple of (CacheAnalysisResult, CPUAnalysisResult)
+    """
+    return await asyncio.gather(
+        CacheAnalyzer().analyze_async(binary_path, args),
+        CPUAnalyzer().analyze_async(binary_path, args),
+    )
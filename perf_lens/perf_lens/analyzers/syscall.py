@@ -4,15 +4,29 @@ System Call Analyzer using strace.
 Analyzes system call usage, timing, and overhead.
 """
 
+import heapq
+import os
 import re
-import subprocess
-import shutil
+import sys
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Optional
+from operator import attrgetter
+from typing import Iterator, Optional
 
+from ._tools import find_tool, run_tool, temp_log_path
 
-@dataclass
+
+# Rule lines framing the rows of the strace -c summary table
+_TABLE_RULE = "\n------"
+_RULE_DASHES_RE = re.compile(r"-+")
+
+# Columns of the table: % time, seconds, usecs/call, calls, errors, syscall
+_NUM_COLUMNS = 6
+
+# Character spans of the table columns, taken from a rule line
+ColumnSpans = list[tuple[int, int]]
+
+
+@dataclass(slots=True)
 class SyscallInfo:
     """Information about a specific system call."""
     name: str
@@ -22,7 +36,7 @@ class SyscallInfo:
     time_percent: float
 
 
-@dataclass
+@dataclass(slots=True)
 class SyscallAnalysisResult:
     """Complete result of system call analysis."""
     binary_path: str
@@ -50,8 +64,14 @@ class SyscallAnalyzer:
         result = analyzer.analyze("./my_binary")
     """
     
+    # strace options placed before the log file and binary
+    STRACE_ARGS = (
+        "-c",  # Summary mode
+        "-S", "time",  # Sort by time
+    )
+    
     def __init__(self) -> None:
-        self._strace_path: Optional[str] = shutil.which("strace")
+        self._strace_path: Optional[str] = find_tool("strace")
     
     def is_available(self) -> bool:
         """Check if strace is installed and accessible."""
@@ -61,7 +81,9 @@ class SyscallAnalyzer:
         self,
         binary_path: str,
         args: Optional[list[str]] = None,
-        timeout: int = 300
+        timeout: int = 300,
+        keep_raw: bool = False,
+        parse: bool = True
     ) -> SyscallAnalysisResult:
         """
         Run system call analysis on the specified binary.
@@ -70,6 +92,9 @@ class SyscallAnalyzer:
             binary_path: Path to the executable to analyze
             args: Optional command-line arguments to pass to the binary
             timeout: Maximum execution time in seconds
+            keep_raw: Keep the tool output in raw_output (default: False)
+            parse: Parse the tool output; when False only raw_output is
+                filled in (default: True)
             
         Returns:
             SyscallAnalysisResult containing syscall statistics
@@ -84,8 +109,7 @@ class SyscallAnalyzer:
                 error="strace is not installed. Install with: sudo apt install strace"
             )
         
-        binary = Path(binary_path)
-        if not binary.exists():
+        if not os.path.exists(binary_path):
             return SyscallAnalysisResult(
                 binary_path=binary_path,
                 total_syscalls=0,
@@ -95,69 +119,139 @@ class SyscallAnalyzer:
                 error=f"Binary not found: {binary_path}"
             )
         
-        # Build strace command with summary
-        cmd = [
-            self._strace_path,
-            "-c",  # Summary mode
-            "-S", "time",  # Sort by time
-            str(binary.absolute())
-        ]
-        if args:
-            cmd.extend(args)
+        with temp_log_path() as log_path:
+            # Build strace command with summary
+            cmd = [
+                self._strace_path,
+                *self.STRACE_ARGS,
+                "-o", log_path,  # Write the summary to a file, not stderr
+                os.path.abspath(binary_path),
+                *(args or ())
+            ]
+            
+            raw, error = run_tool(cmd, timeout, log_path)
         
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
-            # strace outputs summary to stderr
-            output = result.stderr
-            return self._parse_output(binary_path, output)
-        except subprocess.TimeoutExpired:
+        if error is not None:
             return SyscallAnalysisResult(
                 binary_path=binary_path,
                 total_syscalls=0,
                 total_time_seconds=0,
                 syscalls=[],
                 raw_output="",
-                error=f"Analysis timed out after {timeout} seconds"
+                error=error
             )
-        except Exception as e:
+        
+        output = raw.decode("utf-8", errors="replace")
+        if not parse:
             return SyscallAnalysisResult(
                 binary_path=binary_path,
                 total_syscalls=0,
                 total_time_seconds=0,
                 syscalls=[],
-                raw_output="",
-                error=str(e)
+                raw_output=output
             )
+        return self._parse_output(binary_path, output, keep_raw)
     
-    def _parse_output(self, binary_path: str, output: str) -> SyscallAnalysisResult:
+    def _parse_output(
+        self,
+        binary_path: str,
+        output: str,
+        keep_raw: bool = False
+    ) -> SyscallAnalysisResult:
         """Parse strace -c output and extract syscall statistics."""
-        syscalls: list[SyscallInfo] = []
         total_time = 0.0
         total_calls = 0
         
         # Parse strace summary table
         # Format: % time    seconds  usecs/call     calls    errors syscall
-        for line in output.split("\n"):
-            line = line.strip()
-            if not line or line.startswith("%") or line.startswith("-"):
-                continue
-            
-            # Parse total line
-            if line.startswith("total"):
-                total_match = re.match(r"total\s+\S+\s+([\d.]+)\s+\S+\s+(\d+)", line)
-                if total_match:
-                    total_time = float(total_match.group(1))
-                    total_calls = int(total_match.group(2))
-                continue
-            
-            # Parse syscall lines
-            # Format: "  5.26    0.000052          17         3           write"
-            parts = line.split()
+        #         ------ ----------- ----------- --------- --------- ---------
+        #         <one row per syscall>
+        #         ------ ----------- ----------- --------- --------- ---------
+        #         <total row>
+        # Cut the rows and the total row out of the table with the rule lines
+        # instead of testing every line for header, rule and total markers
+        _, found, table = output.partition(_TABLE_RULE)
+        spans: Optional[ColumnSpans] = None
+        if found:
+            rule, _, table = table.partition("\n")
+            spans = self._column_spans(found.lstrip("\n") + rule)
+        else:
+            table = output
+        rows, found, tail = table.rpartition(_TABLE_RULE)
+        if found:
+            total_row = tail.partition("\n")[2]
+        else:
+            # No closing rule: the total row, if any, is the last line
+            rows, _, total_row = table.rstrip().rpartition("\n")
+            if not total_row.endswith("total"):
+                rows, total_row = table, ""
+        
+        syscalls = list(self._iter_syscalls(rows, spans))
+        
+        # Parse total line
+        # Format: "100.00    0.000988          10        95         3 total"
+        # usecs/call and errors may be blank, so the calls count is only
+        # taken from the row when its columns are known
+        fields = self._split_row(total_row, spans)
+        if fields and fields[-1] == "total":
+            try:
+                total_time = float(fields[1])
+                if spans is not None or len(fields) == _NUM_COLUMNS:
+                    total_calls = int(fields[3])
+            except ValueError:
+                pass
+        if not total_calls:
+            total_calls = sum(syscall.calls for syscall in syscalls)
+        
+        # Top 15 syscalls by time (descending)
+        top_syscalls = heapq.nlargest(15, syscalls, key=attrgetter("time_seconds"))
+        
+        return SyscallAnalysisResult(
+            binary_path=binary_path,
+            total_syscalls=total_calls,
+            total_time_seconds=total_time,
+            syscalls=top_syscalls,
+            raw_output=output if keep_raw else ""
+        )
+    
+    def _column_spans(self, rule: str) -> Optional[ColumnSpans]:
+        """Return the column spans of a table rule line, or None if it is not one."""
+        spans = [match.span() for match in _RULE_DASHES_RE.finditer(rule)]
+        if len(spans) != _NUM_COLUMNS:
+            return None
+        return spans
+    
+    def _split_row(self, line: str, spans: Optional[ColumnSpans]) -> list[str]:
+        """
+        Split a table row into its fields.
+        
+        With column spans every field is returned, blank ones as "".
+        Numbers are right-aligned, so each field runs from the end of the
+        previous column; the syscall name runs to the end of the line.
+        Without spans the row is split on whitespace and blank fields are
+        lost.
+        """
+        if spans is None:
+            return line.split()
+        if not line.strip():
+            return []
+        fields = []
+        start = 0
+        for _, end in spans[:-1]:
+            fields.append(line[start:end].strip())
+            start = end
+        fields.append(line[spans[-1][0]:].strip())
+        return fields
+    
+    def _iter_syscalls(
+        self,
+        rows: str,
+        spans: Optional[ColumnSpans] = None
+    ) -> Iterator[SyscallInfo]:
+        """Yield a SyscallInfo for each row of the strace -c table."""
+        # Format: "  5.26    0.000052          17         3           write"
+        for line in rows.splitlines():
+            parts = self._split_row(line, spans)
             if len(parts) >= 5:
                 try:
                     time_percent = float(parts[0])
@@ -166,29 +260,18 @@ class SyscallAnalyzer:
                     
                     # Check if errors column exists
                     if len(parts) == 6:
-                        errors = int(parts[4])
+                        errors = int(parts[4] or 0)
                         name = parts[5]
                     else:
                         errors = 0
                         name = parts[4]
-                    
-                    syscalls.append(SyscallInfo(
-                        name=name,
-                        calls=calls,
-                        errors=errors,
-                        time_seconds=time_seconds,
-                        time_percent=time_percent
-                    ))
                 except (ValueError, IndexError):
                     continue
-        
-        # Sort by time (descending)
-        syscalls.sort(key=lambda x: x.time_seconds, reverse=True)
-        
-        return SyscallAnalysisResult(
-            binary_path=binary_path,
-            total_syscalls=total_calls,
-            total_time_seconds=total_time,
-            syscalls=syscalls[:15],  # Top 15 syscalls
-            raw_output=output
-        )
+                
+                yield SyscallInfo(
+                    name=sys.intern(name),
+                    calls=calls,
+                    errors=errors,
+                    time_seconds=time_seconds,
+                    time_percent=time_percent
+                )
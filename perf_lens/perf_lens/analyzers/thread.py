@@ -4,15 +4,27 @@ Thread Analyzer using Valgrind Helgrind.
 Detects threading issues: data races, deadlocks, lock order violations.
 """
 
+import io
+import os
 import re
-import subprocess
-import shutil
+from collections import Counter
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
+from ._tools import find_tool, run_tool, temp_log_path
 
-@dataclass
+
+# Helgrind reports are separated by an empty "==<pid>==" line
+_SEPARATOR_RE = re.compile(r"==\d+==")
+_PID_PREFIX_RE = re.compile(r"^==\d+==\s*")
+_PID_INDENT_RE = re.compile(r"==\d+==\s+")
+_PID_RE = re.compile(r"==(\d+)==")
+_THREAD_RE = re.compile(r"Thread #(\d+)")
+_SUMMARY_RE = re.compile(r"ERROR SUMMARY: (\d+) errors")
+_STACK_PREFIXES = ("at ", "by ")
+
+
+@dataclass(slots=True)
 class ThreadIssue:
     """Represents a threading issue detected by Helgrind."""
     issue_type: str  # "data race", "lock order violation", "mutex error"
@@ -21,7 +33,7 @@ class ThreadIssue:
     thread_id: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ThreadAnalysisResult:
     """Complete result of thread analysis."""
     binary_path: str
@@ -48,8 +60,11 @@ class ThreadAnalyzer:
         result = analyzer.analyze("./my_threaded_binary")
     """
     
+    # Helgrind options placed before the log file and binary
+    HELGRIND_ARGS = ("--tool=helgrind", "--history-level=full")
+    
     def __init__(self) -> None:
-        self._valgrind_path: Optional[str] = shutil.which("valgrind")
+        self._valgrind_path: Optional[str] = find_tool("valgrind")
     
     def is_available(self) -> bool:
         """Check if Valgrind is installed and accessible."""
@@ -59,7 +74,9 @@ class ThreadAnalyzer:
         self,
         binary_path: str,
         args: Optional[list[str]] = None,
-        timeout: int = 600
+        timeout: int = 600,
+        keep_raw: bool = False,
+        parse: bool = True
     ) -> ThreadAnalysisResult:
         """
         Run thread analysis on the specified binary.
@@ -68,6 +85,9 @@ class ThreadAnalyzer:
             binary_path: Path to the executable to analyze
             args: Optional command-line arguments to pass to the binary
             timeout: Maximum execution time in seconds (default: 10 minutes)
+            keep_raw: Keep the tool output in raw_output (default: False)
+            parse: Parse the tool output; when False only raw_output is
+                filled in (default: True)
             
         Returns:
             ThreadAnalysisResult containing detected threading issues
@@ -84,8 +104,7 @@ class ThreadAnalyzer:
                 error="Valgrind is not installed. Install with: sudo apt install valgrind"
             )
         
-        binary = Path(binary_path)
-        if not binary.exists():
+        if not os.path.exists(binary_path):
             return ThreadAnalysisResult(
                 binary_path=binary_path,
                 total_issues=0,
@@ -97,27 +116,19 @@ class ThreadAnalyzer:
                 error=f"Binary not found: {binary_path}"
             )
         
-        # Build helgrind command
-        cmd = [
-            self._valgrind_path,
-            "--tool=helgrind",
-            "--history-level=full",
-            str(binary.absolute())
-        ]
-        if args:
-            cmd.extend(args)
+        with temp_log_path() as log_path:
+            # Build helgrind command
+            cmd = [
+                self._valgrind_path,
+                *self.HELGRIND_ARGS,
+                f"--log-file={log_path}",  # Write the report to a file, not stderr
+                os.path.abspath(binary_path),
+                *(args or ())
+            ]
+            
+            raw, error = run_tool(cmd, timeout, log_path)
         
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
-            # Valgrind outputs to stderr
-            output = result.stderr
-            return self._parse_output(binary_path, output)
-        except subprocess.TimeoutExpired:
+        if error is not None:
             return ThreadAnalysisResult(
                 binary_path=binary_path,
                 total_issues=0,
@@ -126,9 +137,11 @@ class ThreadAnalyzer:
                 mutex_errors=0,
                 issues=[],
                 raw_output="",
-                error=f"Analysis timed out after {timeout} seconds"
+                error=error
             )
-        except Exception as e:
+        
+        output = raw.decode("utf-8", errors="replace")
+        if not parse:
             return ThreadAnalysisResult(
                 binary_path=binary_path,
                 total_issues=0,
@@ -136,52 +149,81 @@ class ThreadAnalyzer:
                 lock_order_violations=0,
                 mutex_errors=0,
                 issues=[],
-                raw_output="",
-                error=str(e)
+                raw_output=output
             )
+        return self._parse_output(binary_path, output, keep_raw)
     
-    def _parse_output(self, binary_path: str, output: str) -> ThreadAnalysisResult:
+    def _parse_output(
+        self,
+        binary_path: str,
+        output: str,
+        keep_raw: bool = False
+    ) -> ThreadAnalysisResult:
         """Parse Helgrind output and extract threading issues."""
-        issues: list[ThreadIssue] = []
-        data_races = 0
-        lock_violations = 0
-        mutex_errors = 0
-        
-        # Split on error markers
-        error_blocks = re.split(r"==\d+==\s*\n==\d+== ", output)
+        issues = list(self._iter_issues(output))
+        issue_counts = Counter(issue.issue_type for issue in issues)
         
-        for block in error_blocks:
-            if "Possible data race" in block or "data race" in block.lower():
-                issue = self._parse_issue_block(block, "Data Race")
-                if issue:
-                    issues.append(issue)
-                    data_races += 1
-            elif "lock order" in block.lower():
-                issue = self._parse_issue_block(block, "Lock Order Violation")
-                if issue:
-                    issues.append(issue)
-                    lock_violations += 1
-            elif "mutex" in block.lower() and ("error" in block.lower() or "invalid" in block.lower()):
-                issue = self._parse_issue_block(block, "Mutex Error")
-                if issue:
-                    issues.append(issue)
-                    mutex_errors += 1
-        
-        # Parse error summary if present
-        summary_match = re.search(r"ERROR SUMMARY: (\d+) errors", output)
+        # Parse error summary if present; it closes the log, so look for it
+        # from the end rather than scanning the whole output forwards
+        summary_pos = output.rfind("ERROR SUMMARY:")
+        summary_match = _SUMMARY_RE.match(output, summary_pos) if summary_pos >= 0 else None
         total_errors = int(summary_match.group(1)) if summary_match else len(issues)
         
         return ThreadAnalysisResult(
             binary_path=binary_path,
             total_issues=total_errors,
-            data_races=data_races,
-            lock_order_violations=lock_violations,
-            mutex_errors=mutex_errors,
+            data_races=issue_counts["Data Race"],
+            lock_order_violations=issue_counts["Lock Order Violation"],
+            mutex_errors=issue_counts["Mutex Error"],
             issues=issues[:10],  # Top 10 issues
-            raw_output=output
+            raw_output=output if keep_raw else ""
         )
     
-    def _parse_issue_block(self, block: str, issue_type: str) -> Optional[ThreadIssue]:
+    def _iter_issues(self, output: str) -> Iterator[ThreadIssue]:
+        """Yield a ThreadIssue for each classified Helgrind report block."""
+        # Lines of the main process share a constant "==<pid>== " prefix,
+        # which can be stripped without running a regex per line
+        pid_match = _PID_RE.search(output)
+        pid_prefix = f"=={pid_match.group(1)}== " if pid_match else ""
+        
+        for block in self._iter_blocks(output):
+            # Classify the block, lowering it at most once
+            if "Possible data race" in block:
+                issue_type = "Data Race"
+            else:
+                lowered = block.lower()
+                if "data race" in lowered:
+                    issue_type = "Data Race"
+                elif "lock order" in lowered:
+                    issue_type = "Lock Order Violation"
+                elif "mutex" in lowered and ("error" in lowered or "invalid" in lowered):
+                    issue_type = "Mutex Error"
+                else:
+                    continue
+            
+            issue = self._parse_issue_block(block, issue_type, pid_prefix)
+            if issue:
+                yield issue
+    
+    def _iter_blocks(self, output: str) -> Iterator[str]:
+        """Yield the report blocks of Helgrind output one at a time."""
+        block_lines: list[str] = []
+        for line in io.StringIO(output):
+            if _SEPARATOR_RE.fullmatch(line.rstrip()):
+                if block_lines:
+                    yield "".join(block_lines)
+                    block_lines = []
+            else:
+                block_lines.append(line)
+        if block_lines:
+            yield "".join(block_lines)
+    
+    def _parse_issue_block(
+        self,
+        block: str,
+        issue_type: str,
+        pid_prefix: str = ""
+    ) -> Optional[ThreadIssue]:
         """Parse a single issue block from Helgrind output."""
         lines = block.strip().split("\n")
         if not lines:
@@ -189,21 +231,26 @@ class ThreadAnalyzer:
         
         # First line is usually the description
         description = lines[0].strip()
-        description = re.sub(r"^==\d+==\s*", "", description)
+        description = _PID_PREFIX_RE.sub("", description)
         
         # Extract stack trace
         stack_trace = []
         thread_id = None
         
         for line in lines[1:]:
-            # Look for thread ID
-            thread_match = re.search(r"Thread #(\d+)", line)
-            if thread_match:
-                thread_id = int(thread_match.group(1))
+            # Look for thread ID; the substring test skips the regex on
+            # the many lines that cannot match
+            if "Thread #" in line:
+                thread_match = _THREAD_RE.search(line)
+                if thread_match:
+                    thread_id = int(thread_match.group(1))
             
             # Look for stack frames
-            cleaned = re.sub(r"==\d+==\s+", "", line).strip()
-            if cleaned.startswith(("at ", "by ")):
+            if pid_prefix and line.startswith(pid_prefix):
+                cleaned = line.removeprefix(pid_prefix).strip()
+            else:
+                cleaned = _PID_INDENT_RE.sub("", line).strip()
+            if cleaned.startswith(_STACK_PREFIXES):
                 stack_trace.append(cleaned)
         
         if description:
@@ -4,6 +4,10 @@ Perf-Lens CLI Entry Point.
 Provides user-friendly commands for C++ performance analysis.
 """
 
+import contextlib
+import os
+from typing import Any, ContextManager, Optional, Protocol
+
 import click
 from rich.console import Console
 
@@ -21,9 +25,50 @@ from .reporters import ConsoleReporter
 console = Console()
 
 
+class _Analyzer(Protocol):
+    """The part of the analyzer interface "analyze all" relies on."""
+    
+    def is_available(self) -> bool: ...
+    
+    def analyze(self, binary_path: str, args: Optional[list[str]] = None, /) -> Any: ...
+
+
+# Analyses run by "analyze all": name -> (analyzer class, reporter method, title)
+_ALL_ANALYSES: dict[str, tuple[type[_Analyzer], str, str]] = {
+    "memory": (MemoryAnalyzer, "report_memory", "Memory"),
+    "cpu": (CPUAnalyzer, "report_cpu", "CPU"),
+    "cache": (CacheAnalyzer, "report_cache", "Cache"),
+    "syscall": (SyscallAnalyzer, "report_syscall", "Syscall"),
+    "thread": (ThreadAnalyzer, "report_thread", "Thread"),
+}
+
+# Analyses whose numbers are skewed by other load on the machine; "analyze
+# all" runs these one at a time, after the parallel ones have finished
+_TIMING_SENSITIVE = ("cpu", "cache")
+
+
+def _status(message: str) -> ContextManager[Any]:
+    """
+    Show a spinner while a tool runs, on interactive terminals only.
+    
+    The spinner repaints from a background thread; skip it under --no-spinner,
+    when output is not a terminal, or when running in CI.
+    """
+    ctx = click.get_current_context(silent=True)
+    disabled = ctx is not None and ctx.find_root().params.get("no_spinner")
+    if disabled or not console.is_terminal or os.environ.get("CI"):
+        return contextlib.nullcontext()
+    return console.status(message)
+
+
 @click.group()
 @click.version_option(version=__version__, prog_name="perf-lens")
-def main() -> None:
+@click.option(
+    "--no-spinner",
+    is_flag=True,
+    help="Don't show a progress spinner while tools run"
+)
+def main(no_spinner: bool) -> None:
     """
     🔍 Perf-Lens: Intelligent C++ Performance Analysis Tool
     
@@ -55,7 +100,7 @@ def analyze() -> None:
 @click.option(
     "--raw",
     is_flag=True,
-    help="Show raw Valgrind output"
+    help="Show raw Valgrind or LeakSanitizer output instead of the parsed report"
 )
 def analyze_memory(binary: str, args: tuple[str, ...], timeout: int, raw: bool) -> None:
     """
@@ -65,26 +110,30 @@ def analyze_memory(binary: str, args: tuple[str, ...], timeout: int, raw: bool)
         perf-lens analyze memory ./my_program
         perf-lens analyze memory ./my_program -a arg1 -a arg2
     """
-    reporter = ConsoleReporter(console)
+    reporter = ConsoleReporter(console, plain=not console.is_terminal)
     
     console.print(f"[bold blue]🔍 Analyzing memory leaks in:[/bold blue] {binary}")
     console.print()
     
     analyzer = MemoryAnalyzer()
     
-    if not analyzer.is_available():
+    # Sanitizer-instrumented binaries are run under LeakSanitizer instead
+    if not analyzer.is_available(binary):
         console.print("[bold red]Error:[/bold red] Valgrind is not installed.")
         console.print("[dim]Install with: sudo apt install valgrind[/dim]")
         raise SystemExit(1)
     
-    with console.status("[bold green]Running Valgrind analysis..."):
-        result = analyzer.analyze(binary, list(args) if args else None, timeout)
+    with _status("[bold green]Running memory leak analysis..."):
+        result = analyzer.analyze(
+            binary, list(args) if args else None, timeout, parse=not raw
+        )
     
-    reporter.report_memory(result)
+    if not raw or result.error:
+        reporter.report_memory(result)
     
     if raw and result.raw_output:
         console.print()
-        console.print("[bold]Raw Valgrind Output:[/bold]")
+        console.print("[bold]Raw Valgrind/LeakSanitizer Output:[/bold]")
         console.print(result.raw_output)
 
 
@@ -116,7 +165,7 @@ def analyze_memory(binary: str, args: tuple[str, ...], timeout: int, raw: bool)
 @click.option(
     "--raw",
     is_flag=True,
-    help="Show raw perf output"
+    help="Show the raw perf hotspot listing instead of the parsed report"
 )
 def analyze_cpu(
     binary: str,
@@ -133,7 +182,7 @@ def analyze_cpu(
         perf-lens analyze cpu ./my_program
         perf-lens analyze cpu ./my_program -d 60 -o ./reports
     """
-    reporter = ConsoleReporter(console)
+    reporter = ConsoleReporter(console, plain=not console.is_terminal)
     
     console.print(f"[bold blue]🔥 Profiling CPU usage in:[/bold blue] {binary}")
     console.print(f"[dim]Duration: {duration}s, Frequency: {frequency}Hz[/dim]")
@@ -151,21 +200,29 @@ def analyze_cpu(
         console.print("[dim]Download from: https://github.com/brendangregg/FlameGraph[/dim]")
         console.print()
     
-    with console.status("[bold green]Recording CPU samples..."):
+    with _status("[bold green]Recording CPU samples..."):
         result = analyzer.analyze(
             binary,
             list(args) if args else None,
             duration,
             output,
-            frequency
+            frequency,
+            keep_raw=raw
         )
     
-    reporter.report_cpu(result)
+    # The raw listing is built from the aggregated samples, so the samples
+    # are always processed; --raw only swaps what is shown
+    if not raw or result.error:
+        reporter.report_cpu(result)
+    elif result.flamegraph_path:
+        console.print(f"[bold]Flame Graph:[/bold] [green]{result.flamegraph_path}[/green]")
     
     if raw and result.raw_output:
         console.print()
         console.print("[bold]Raw perf Output:[/bold]")
         console.print(result.raw_output)
+
+
 @analyze.command("cache")
 @click.argument("binary", type=click.Path(exists=True))
 @click.option(
@@ -182,7 +239,7 @@ def analyze_cpu(
 @click.option(
     "--raw",
     is_flag=True,
-    help="Show raw perf stat output"
+    help="Show raw perf stat output instead of the parsed report"
 )
 def analyze_cache(binary: str, args: tuple[str, ...], timeout: int, raw: bool) -> None:
     """
@@ -190,7 +247,7 @@ def analyze_cache(binary: str, args: tuple[str, ...], timeout: int, raw: bool) -
     
     Generates L1/L3 cache hit/miss rates and branch prediction statistics.
     """
-    reporter = ConsoleReporter(console)
+    reporter = ConsoleReporter(console, plain=not console.is_terminal)
     
     console.print(f"[bold blue]🚀 Analyzing cache performance in:[/bold blue] {binary}")
     console.print()
@@ -202,10 +259,13 @@ def analyze_cache(binary: str, args: tuple[str, ...], timeout: int, raw: bool) -
         console.print("[dim]Install with: sudo apt install linux-tools-common linux-tools-generic[/dim]")
         raise SystemExit(1)
     
-    with console.status("[bold green]Running perf stat..."):
-        result = analyzer.analyze(binary, list(args) if args else None, timeout)
+    with _status("[bold green]Running perf stat..."):
+        result = analyzer.analyze(
+            binary, list(args) if args else None, timeout, parse=not raw
+        )
     
-    reporter.report_cache(result)
+    if not raw or result.error:
+        reporter.report_cache(result)
     
     if raw and result.raw_output:
         console.print()
@@ -229,7 +289,7 @@ def analyze_cache(binary: str, args: tuple[str, ...], timeout: int, raw: bool) -
 @click.option(
     "--raw",
     is_flag=True,
-    help="Show raw strace output"
+    help="Show raw strace output instead of the parsed report"
 )
 def analyze_syscall(binary: str, args: tuple[str, ...], timeout: int, raw: bool) -> None:
     """
@@ -237,7 +297,7 @@ def analyze_syscall(binary: str, args: tuple[str, ...], timeout: int, raw: bool)
     
     Show slowest syscalls and error rates.
     """
-    reporter = ConsoleReporter(console)
+    reporter = ConsoleReporter(console, plain=not console.is_terminal)
     
     console.print(f"[bold blue]⚙️ Analyzing system call overhead in:[/bold blue] {binary}")
     console.print()
@@ -249,10 +309,13 @@ def analyze_syscall(binary: str, args: tuple[str, ...], timeout: int, raw: bool)
         console.print("[dim]Install with: sudo apt install strace[/dim]")
         raise SystemExit(1)
     
-    with console.status("[bold green]Running strace..."):
-        result = analyzer.analyze(binary, list(args) if args else None, timeout)
+    with _status("[bold green]Running strace..."):
+        result = analyzer.analyze(
+            binary, list(args) if args else None, timeout, parse=not raw
+        )
     
-    reporter.report_syscall(result)
+    if not raw or result.error:
+        reporter.report_syscall(result)
     
     if raw and result.raw_output:
         console.print()
@@ -276,7 +339,7 @@ def analyze_syscall(binary: str, args: tuple[str, ...], timeout: int, raw: bool)
 @click.option(
     "--raw",
     is_flag=True,
-    help="Show raw Helgrind output"
+    help="Show raw Helgrind output instead of the parsed report"
 )
 def analyze_thread(binary: str, args: tuple[str, ...], timeout: int, raw: bool) -> None:
     """
@@ -284,7 +347,7 @@ def analyze_thread(binary: str, args: tuple[str, ...], timeout: int, raw: bool)
     
     Detects data races, deadlocks, and mutex errors.
     """
-    reporter = ConsoleReporter(console)
+    reporter = ConsoleReporter(console, plain=not console.is_terminal)
     
     console.print(f"[bold blue]🧵 Analyzing threading issues in:[/bold blue] {binary}")
     console.print()
@@ -296,15 +359,161 @@ def analyze_thread(binary: str, args: tuple[str, ...], timeout: int, raw: bool)
         console.print("[dim]Install with: sudo apt install valgrind[/dim]")
         raise SystemExit(1)
     
-    with console.status("[bold green]Running Helgrind..."):
-        result = analyzer.analyze(binary, list(args) if args else None, timeout)
+    with _status("[bold green]Running Helgrind..."):
+        result = analyzer.analyze(
+            binary, list(args) if args else None, timeout, parse=not raw
+        )
     
-    reporter.report_thread(result)
+    if not raw or result.error:
+        reporter.report_thread(result)
     
     if raw and result.raw_output:
         console.print()
         console.print("[bold]Raw Helgrind Output:[/bold]")
         console.print(result.raw_output)
+
+
+def _run_analysis(
+    name: str,
+    binary: str,
+    args: Optional[list[str]],
+    timeout: int,
+    duration: int,
+    output: str
+) -> Any:
+    """Run one analysis of "analyze all" (in a worker process for the parallel ones)."""
+    if name == "cpu":
+        return CPUAnalyzer().analyze(binary, args, duration, output)
+    if name == "memory":
+        return MemoryAnalyzer().analyze(binary, args, timeout)
+    if name == "cache":
+        return CacheAnalyzer().analyze(binary, args, timeout)
+    if name == "syscall":
+        return SyscallAnalyzer().analyze(binary, args, timeout)
+    return ThreadAnalyzer().analyze(binary, args, timeout)
+
+
+@analyze.command("all")
+@click.argument("binary", type=click.Path(exists=True))
+@click.option(
+    "--args", "-a",
+    multiple=True,
+    help="Arguments to pass to the binary (can be used multiple times)"
+)
+@click.option(
+    "--timeout", "-t",
+    default=300,
+    type=int,
+    help="Maximum execution time per analysis in seconds (default: 300)"
+)
+@click.option(
+    "--duration", "-d",
+    default=30,
+    type=int,
+    help="CPU profiling duration in seconds (default: 30)"
+)
+@click.option(
+    "--output", "-o",
+    type=click.Path(),
+    default=".",
+    help="Output directory for flame graph SVG (default: current directory)"
+)
+def analyze_all(
+    binary: str,
+    args: tuple[str, ...],
+    timeout: int,
+    duration: int,
+    output: str
+) -> None:
+    """
+    Run every available analysis.
+    
+    Memory, syscall and thread analysis run the binary in parallel, each in
+    its own process. CPU and cache analysis measure timing, so they run
+    afterwards, one at a time. The reports are shown together, in a fixed
+    order, once every analysis has finished.
+    
+    Example:
+        perf-lens analyze all ./my_program
+        perf-lens analyze all ./my_program -d 60 -o ./reports
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    # Record the reports and write them out in one go at the end
+    reporter = ConsoleReporter(console, plain=not console.is_terminal, record=True)
+    
+    console.print(f"[bold blue]🔍 Running all analyses on:[/bold blue] {binary}")
+    console.print()
+    
+    names = []
+    for name, (analyzer_cls, _, _) in _ALL_ANALYSES.items():
+        analyzer = analyzer_cls()
+        # Memory analysis can run a sanitizer build without Valgrind
+        if isinstance(analyzer, MemoryAnalyzer):
+            available = analyzer.is_available(binary)
+        else:
+            available = analyzer.is_available()
+        if available:
+            names.append(name)
+        else:
+            console.print(f"[yellow]Skipping {name}:[/yellow] required tool is not installed.")
+    
+    if not names:
+        console.print("[bold red]Error:[/bold red] No analysis tools are installed.")
+        console.print("[dim]Run 'perf-lens check' to see what is missing.[/dim]")
+        raise SystemExit(1)
+    
+    arg_list = list(args) if args else None
+    parallel = [name for name in names if name not in _TIMING_SENSITIVE]
+    # Result of each analysis, or the exception it failed with
+    results: dict[str, Any] = {}
+    
+    with _status("[bold green]Running analyses...") as status:
+        def done(name: str, outcome: Any) -> None:
+            results[name] = outcome
+            if status is not None:
+                status.update(
+                    f"[bold green]Running analyses... ({len(results)}/{len(names)} done)"
+                )
+        
+        if parallel:
+            with ProcessPoolExecutor(max_workers=min(len(parallel), os.cpu_count() or 1)) as pool:
+                futures = {
+                    pool.submit(
+                        _run_analysis, name, binary, arg_list, timeout, duration, output
+                    ): name
+                    for name in parallel
+                }
+                for future in as_completed(futures):
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        # e.g. BrokenProcessPool when a worker dies
+                        outcome = e
+                    done(futures[future], outcome)
+        
+        for name in names:
+            if name in _TIMING_SENSITIVE:
+                try:
+                    outcome = _run_analysis(name, binary, arg_list, timeout, duration, output)
+                except Exception as e:
+                    outcome = e
+                done(name, outcome)
+    
+    for name in names:
+        _, report_method, title = _ALL_ANALYSES[name]
+        outcome = results[name]
+        if isinstance(outcome, Exception):
+            reporter.report_error(
+                f"❌ {title} Analysis Failed",
+                str(outcome) or type(outcome).__name__
+            )
+        else:
+            getattr(reporter, report_method)(outcome)
+        reporter.console.print()
+    reporter.flush()
+
+
 @main.command("check")
 def check_dependencies() -> None:
     """Check if required tools are installed."""
@@ -2,18 +2,23 @@
 Console Reporter using Rich library for beautiful terminal output.
 """
 
-from rich.console import Console
+import io
+import sys
+from typing import TYPE_CHECKING, Iterator
+
+from rich.console import Console, Group, RenderableType
 from rich.panel import Panel
 from rich.table import Table
+from rich.style import Style
 from rich.text import Text
-from rich.syntax import Syntax
 from rich import box
 
-from ..analyzers.memory import MemoryAnalysisResult, MemoryLeak
-from ..analyzers.cpu import CPUAnalysisResult, HotspotInfo
-from ..analyzers.cache import CacheAnalysisResult, CacheStats
-from ..analyzers.syscall import SyscallAnalysisResult, SyscallInfo
-from ..analyzers.thread import ThreadAnalysisResult, ThreadIssue
+if TYPE_CHECKING:
+    from ..analyzers.memory import MemoryAnalysisResult, MemoryLeak
+    from ..analyzers.cpu import CPUAnalysisResult, HotspotInfo
+    from ..analyzers.cache import CacheAnalysisResult, CacheStats
+    from ..analyzers.syscall import SyscallAnalysisResult, SyscallInfo
+    from ..analyzers.thread import ThreadAnalysisResult, ThreadIssue
 
 
 class ConsoleReporter:
@@ -21,17 +26,113 @@ class ConsoleReporter:
     Formats and displays analysis results in the terminal using Rich.
     """
     
-    def __init__(self, console: Console | None = None) -> None:
+    # Styles for per-row cell values, applied via Text instead of markup so
+    # Rich doesn't have to parse tags for every cell
+    _STYLE_RED = Style(color="red")
+    _STYLE_BOLD_RED = Style(color="red", bold=True)
+    _STYLE_YELLOW = Style(color="yellow")
+    _STYLE_GREEN = Style(color="green")
+    _STYLE_BLUE = Style(color="blue")
+    _STYLE_CYAN = Style(color="cyan")
+    _STYLE_BOLD_CYAN = Style(color="cyan", bold=True)
+    _STYLE_DIM = Style(dim=True)
+    
+    _BYTE_UNITS = ("B", "KB", "MB", "GB")
+    
+    def __init__(
+        self,
+        console: Console | None = None,
+        plain: bool | None = None,
+        record: bool = False
+    ) -> None:
+        """
+        Args:
+            console: Console to print to (default: a new Console on stdout)
+            plain: Write reports as tab-separated plain text instead of
+                rendering them with Rich (default: when no console is given
+                and stdout is not a TTY)
+            record: Collect rendered reports in memory until flush() is
+                called, so several reports reach stdout in one write
+                (ignored in plain mode)
+        """
+        if plain is None:
+            plain = console is None and not sys.stdout.isatty()
+        self._plain = plain
+        self._record = record and not plain
+        # Styled cells for column values that repeat across rows and reports
+        self._text_cache: dict[tuple[str, Style], Text] = {}
+        if self._record:
+            console = Console(
+                record=True,
+                file=io.StringIO(),
+                force_terminal=True,
+                width=console.width if console is not None else None
+            )
         self.console = console or Console()
     
-    def report_memory(self, result: MemoryAnalysisResult) -> None:
+    def flush(self) -> None:
+        """Write out the reports collected since the last flush (record mode only)."""
+        if not self._record:
+            return
+        sys.stdout.write(self.console.export_text(clear=True, styles=sys.stdout.isatty()))
+        sys.stdout.flush()
+        # The recording console also rendered into its StringIO; drop that copy
+        self.console.file.seek(0)
+        self.console.file.truncate()
+    
+    def _print(self, renderable: RenderableType) -> None:
+        """Print a renderable as plain text or through the Rich console."""
+        if self._plain:
+            out = self.console.file
+            out.writelines(self._plain_lines(renderable))
+            out.flush()
+            return
+        
+        self.console.print(renderable)
+    
+    def _cached_text(self, text: str, style: Style) -> Text:
+        """Return a shared styled Text for a repeated cell value."""
+        key = (text, style)
+        cached = self._text_cache.get(key)
+        if cached is None:
+            cached = self._text_cache[key] = Text(text, style=style)
+        return cached
+    
+    def _plain_lines(self, renderable: RenderableType) -> Iterator[str]:
+        """Yield the report renderables as plain-text lines, skipping Rich rendering."""
+        if isinstance(renderable, Group):
+            for item in renderable.renderables:
+                yield from self._plain_lines(item)
+        elif isinstance(renderable, Panel):
+            if renderable.title:
+                yield f"== {self._plain_text(renderable.title)} ==\n"
+            yield from self._plain_lines(renderable.renderable)
+        elif isinstance(renderable, Table):
+            if renderable.title:
+                yield f"{self._plain_text(renderable.title)}\n"
+            if renderable.show_header:
+                yield "\t".join(str(column.header) for column in renderable.columns) + "\n"
+            for row in zip(*(column.cells for column in renderable.columns)):
+                yield "\t".join(str(cell) for cell in row) + "\n"
+        else:
+            yield f"{renderable}\n"
+    
+    def _plain_text(self, text: str | Text) -> str:
+        """Strip markup from a title."""
+        return text.plain if isinstance(text, Text) else Text.from_markup(text).plain
+    
+    def report_error(self, title: str, error: str) -> None:
+        """Display an analysis failure panel."""
+        self._print(Panel(
+            Text.assemble(("Error:", self._STYLE_BOLD_RED), " ", error),
+            title=title,
+            border_style="red"
+        ))
+    
+    def report_memory(self, result: "MemoryAnalysisResult") -> None:
         """Display memory leak analysis results."""
         if result.error:
-            self.console.print(Panel(
-                f"[bold red]Error:[/bold red] {result.error}",
-                title="❌ Memory Analysis Failed",
-                border_style="red"
-            ))
+            self.report_error("❌ Memory Analysis Failed", result.error)
             return
         
         # Summary Panel
@@ -54,54 +155,54 @@ class ConsoleReporter:
         status = "✅ No Leaks" if total_leaked == 0 else "⚠️ Leaks Detected"
         color = "green" if total_leaked == 0 else "yellow"
         
-        self.console.print(Panel(
+        renderables: list[RenderableType] = [Panel(
             summary,
             title=f"[bold]{status}[/bold] Memory Analysis Summary",
             border_style=color
-        ))
+        )]
         
         # Top 10 Leaks Table
         if result.leaks:
-            self.console.print()
-            self._print_leaks_table(result.leaks)
+            renderables += ["", self._build_leaks_table(result.leaks)]
+        
+        self._print(Group(*renderables))
     
-    def _print_leaks_table(self, leaks: list[MemoryLeak]) -> None:
-        """Print table of top memory leaks."""
+    def _build_leaks_table(self, leaks: "list[MemoryLeak]") -> Table:
+        """Build table of top memory leaks."""
         table = Table(
             title="🔍 Top 10 Memory Leaks",
             box=box.ROUNDED,
-            show_lines=True,
+            show_lines=False,
             title_style="bold magenta"
         )
         
         table.add_column("#", style="dim", width=3)
         table.add_column("Bytes", style="bold red", justify="right")
         table.add_column("Blocks", justify="right")
-        table.add_column("Type", style="yellow")
+        table.add_column("Type")
         table.add_column("Location", style="cyan", overflow="fold")
         
-        for i, leak in enumerate(leaks, 1):
-            # Get first meaningful stack frame
-            location = leak.stack_trace[0] if leak.stack_trace else "Unknown"
-            
-            table.add_row(
+        # Build all rows in one pass, then add them from plain tuples
+        rows = [
+            (
                 str(i),
                 self._format_bytes(leak.bytes_lost),
                 str(leak.blocks),
-                leak.leak_type,
-                location
+                self._cached_text(leak.leak_type, self._STYLE_YELLOW),
+                # First meaningful stack frame
+                leak.stack_trace[0] if leak.stack_trace else "Unknown",
             )
+            for i, leak in enumerate(leaks, 1)
+        ]
+        for row in rows:
+            table.add_row(*row)
         
-        self.console.print(table)
+        return table
     
-    def report_cpu(self, result: CPUAnalysisResult) -> None:
+    def report_cpu(self, result: "CPUAnalysisResult") -> None:
         """Display CPU profiling results."""
         if result.error:
-            self.console.print(Panel(
-                f"[bold red]Error:[/bold red] {result.error}",
-                title="❌ CPU Analysis Failed",
-                border_style="red"
-            ))
+            self.report_error("❌ CPU Analysis Failed", result.error)
             return
         
         # Summary Panel
@@ -113,23 +214,27 @@ class ConsoleReporter:
         summary.add_row("Total Samples:", str(result.total_samples))
         
         if result.flamegraph_path:
-            summary.add_row("Flame Graph:", f"[green]{result.flamegraph_path}[/green]")
+            summary.add_row("Flame Graph:", Text(result.flamegraph_path, style=self._STYLE_GREEN))
         else:
-            summary.add_row("Flame Graph:", "[dim]Not generated (flamegraph.pl not found)[/dim]")
+            summary.add_row(
+                "Flame Graph:",
+                Text("Not generated (flamegraph.pl not found)", style=self._STYLE_DIM)
+            )
         
-        self.console.print(Panel(
+        renderables: list[RenderableType] = [Panel(
             summary,
             title="[bold]🔥 CPU Analysis Summary[/bold]",
             border_style="blue"
-        ))
+        )]
         
         # Hotspots Table
         if result.hotspots:
-            self.console.print()
-            self._print_hotspots_table(result.hotspots)
+            renderables += ["", self._build_hotspots_table(result.hotspots)]
+        
+        self._print(Group(*renderables))
     
-    def _print_hotspots_table(self, hotspots: list[HotspotInfo]) -> None:
-        """Print table of CPU hotspots."""
+    def _build_hotspots_table(self, hotspots: "list[HotspotInfo]") -> Table:
+        """Build table of CPU hotspots."""
         table = Table(
             title="🎯 Top 10 CPU Hotspots",
             box=box.ROUNDED,
@@ -140,52 +245,48 @@ class ConsoleReporter:
         table.add_column("#", style="dim", width=3)
         table.add_column("Overhead", style="bold red", justify="right")
         table.add_column("Samples", justify="right")
-        table.add_column("Module", style="blue")
-        table.add_column("Function", style="cyan", overflow="fold")
+        table.add_column("Module")
+        table.add_column("Function", overflow="fold")
         
-        for i, hotspot in enumerate(hotspots, 1):
-            # Color overhead based on severity
-            overhead_str = f"{hotspot.overhead_percent:.2f}%"
-            if hotspot.overhead_percent > 20:
-                overhead_str = f"[bold red]{overhead_str}[/bold red]"
-            elif hotspot.overhead_percent > 10:
-                overhead_str = f"[yellow]{overhead_str}[/yellow]"
-            
-            table.add_row(
+        # Build all rows in one pass, then add them from plain tuples
+        rows = [
+            (
                 str(i),
-                overhead_str,
+                self._format_overhead(hotspot.overhead_percent),
                 str(hotspot.samples),
-                hotspot.module,
-                hotspot.function_name
+                self._cached_text(hotspot.module, self._STYLE_BLUE),
+                self._cached_text(hotspot.function_name, self._STYLE_CYAN),
             )
+            for i, hotspot in enumerate(hotspots, 1)
+        ]
+        for row in rows:
+            table.add_row(*row)
         
-        self.console.print(table)
+        return table
+    
+    def _format_overhead(self, percent: float) -> Text:
+        """Format hotspot overhead, colored by severity."""
+        if percent > 20:
+            return Text(f"{percent:.2f}%", style=self._STYLE_BOLD_RED)
+        elif percent > 10:
+            return Text(f"{percent:.2f}%", style=self._STYLE_YELLOW)
+        return Text(f"{percent:.2f}%")
     
     def _format_bytes(self, bytes_count: int) -> str:
         """Format byte count in human-readable form."""
         if bytes_count == 0:
             return "0 B"
         
-        units = ["B", "KB", "MB", "GB"]
-        unit_idx = 0
-        value = float(bytes_count)
-        
-        while value >= 1024 and unit_idx < len(units) - 1:
-            value /= 1024
-            unit_idx += 1
-        
+        # Each unit step is 10 bits, so the unit follows from the bit length
+        unit_idx = min((bytes_count.bit_length() - 1) // 10, len(self._BYTE_UNITS) - 1)
         if unit_idx == 0:
-            return f"{int(value)} {units[unit_idx]}"
-        return f"{value:.2f} {units[unit_idx]}"
+            return f"{bytes_count} B"
+        return f"{bytes_count / (1 << (unit_idx * 10)):.2f} {self._BYTE_UNITS[unit_idx]}"
 
-    def report_cache(self, result: CacheAnalysisResult) -> None:
+    def report_cache(self, result: "CacheAnalysisResult") -> None:
         """Display cache analysis results."""
         if result.error:
-            self.console.print(Panel(
-                f"[bold red]Error:[/bold red] {result.error}",
-                title="❌ Cache Analysis Failed",
-                border_style="red"
-            ))
+            self.report_error("❌ Cache Analysis Failed", result.error)
             return
 
         # Summary Panel
@@ -197,51 +298,52 @@ class ConsoleReporter:
         summary.add_row("IPC:", f"{result.ipc:.2f}")
         summary.add_row("Branch Miss Rate:", f"{result.branch_miss_rate:.2f}%")
 
-        self.console.print(Panel(
+        renderables: list[RenderableType] = [Panel(
             summary,
             title="[bold]🚀 Cache Performance Summary[/bold]",
             border_style="magenta"
-        ))
+        )]
 
         # Cache Stats Table
         if result.cache_stats:
-            self.console.print()
-            table = Table(
-                title="💾 Cache Statistics",
-                box=box.ROUNDED,
-                show_lines=True,
-                title_style="bold magenta"
-            )
-            
-            table.add_column("Level", style="bold cyan")
-            table.add_column("Loads", justify="right")
-            table.add_column("Load Misses", justify="right")
-            table.add_column("Load Miss %", justify="right", style="bold yellow")
-            table.add_column("Stores", justify="right")
-            table.add_column("Store Misses", justify="right")
-            table.add_column("Store Miss %", justify="right", style="bold yellow")
+            renderables += ["", self._build_cache_table(result.cache_stats)]
+
+        self._print(Group(*renderables))
+
+    def _build_cache_table(self, cache_stats: "list[CacheStats]") -> Table:
+        """Build table of per-level cache statistics."""
+        table = Table(
+            title="💾 Cache Statistics",
+            box=box.ROUNDED,
+            show_lines=False,
+            title_style="bold magenta"
+        )
+        
+        table.add_column("Level", style="bold cyan")
+        table.add_column("Loads", justify="right")
+        table.add_column("Load Misses", justify="right")
+        table.add_column("Load Miss %", justify="right", style="bold yellow")
+        table.add_column("Stores", justify="right")
+        table.add_column("Store Misses", justify="right")
+        table.add_column("Store Miss %", justify="right", style="bold yellow")
 
-            for stats in result.cache_stats:
-                table.add_row(
-                    stats.level,
-                    self._format_big_num(stats.loads),
-                    self._format_big_num(stats.load_misses),
-                    self._format_rate(stats.load_miss_rate),
-                    self._format_big_num(stats.stores),
-                    self._format_big_num(stats.store_misses),
-                    self._format_rate(stats.store_miss_rate)
-                )
-            
-            self.console.print(table)
+        for stats in cache_stats:
+            table.add_row(
+                stats.level,
+                self._format_big_num(stats.loads),
+                self._format_big_num(stats.load_misses),
+                self._format_rate(stats.load_miss_rate),
+                self._format_big_num(stats.stores),
+                self._format_big_num(stats.store_misses),
+                self._format_rate(stats.store_miss_rate)
+            )
+        
+        return table
 
-    def report_syscall(self, result: SyscallAnalysisResult) -> None:
+    def report_syscall(self, result: "SyscallAnalysisResult") -> None:
         """Display syscall analysis results."""
         if result.error:
-            self.console.print(Panel(
-                f"[bold red]Error:[/bold red] {result.error}",
-                title="❌ Syscall Analysis Failed",
-                border_style="red"
-            ))
+            self.report_error("❌ Syscall Analysis Failed", result.error)
             return
 
         # Summary
@@ -253,46 +355,47 @@ class ConsoleReporter:
         summary.add_row("Total Calls:", str(result.total_syscalls))
         summary.add_row("Error Rate:", f"{result.error_rate:.2f}%")
 
-        self.console.print(Panel(
+        renderables: list[RenderableType] = [Panel(
             summary,
             title="[bold]⚙️ System Call Analysis[/bold]",
             border_style="blue"
-        ))
+        )]
 
         # Syscalls Table
         if result.syscalls:
-            self.console.print()
-            table = Table(
-                title="Top System Calls by Time",
-                box=box.ROUNDED,
-                title_style="bold magenta"
-            )
-            
-            table.add_column("Syscall", style="bold cyan")
-            table.add_column("% Time", justify="right", style="yellow")
-            table.add_column("Seconds", justify="right")
-            table.add_column("Calls", justify="right")
-            table.add_column("Errors", justify="right", style="red")
+            renderables += ["", self._build_syscall_table(result.syscalls)]
+
+        self._print(Group(*renderables))
 
-            for syscall in result.syscalls:
-                table.add_row(
-                    syscall.name,
-                    f"{syscall.time_percent:.2f}%",
-                    f"{syscall.time_seconds:.6f}",
-                    str(syscall.calls),
-                    str(syscall.errors) if syscall.errors > 0 else "-"
-                )
-            
-            self.console.print(table)
+    def _build_syscall_table(self, syscalls: "list[SyscallInfo]") -> Table:
+        """Build table of the slowest system calls."""
+        table = Table(
+            title="Top System Calls by Time",
+            box=box.ROUNDED,
+            title_style="bold magenta"
+        )
+        
+        table.add_column("Syscall")
+        table.add_column("% Time", justify="right", style="yellow")
+        table.add_column("Seconds", justify="right")
+        table.add_column("Calls", justify="right")
+        table.add_column("Errors", justify="right", style="red")
+
+        for syscall in syscalls:
+            table.add_row(
+                self._cached_text(syscall.name, self._STYLE_BOLD_CYAN),
+                f"{syscall.time_percent:.2f}%",
+                f"{syscall.time_seconds:.6f}",
+                str(syscall.calls),
+                str(syscall.errors) if syscall.errors > 0 else "-"
+            )
+        
+        return table
 
-    def report_thread(self, result: ThreadAnalysisResult) -> None:
+    def report_thread(self, result: "ThreadAnalysisResult") -> None:
         """Display thread analysis results."""
         if result.error:
-            self.console.print(Panel(
-                f"[bold red]Error:[/bold red] {result.error}",
-                title="❌ Thread Analysis Failed",
-                border_style="red"
-            ))
+            self.report_error("❌ Thread Analysis Failed", result.error)
             return
 
         # Summary
@@ -301,54 +404,62 @@ class ConsoleReporter:
         summary.add_column(style="white")
         summary.add_row("Binary:", result.binary_path)
         summary.add_row("Total Issues:", str(result.total_issues))
-        summary.add_row("Data Races:", f"[red]{result.data_races}[/red]")
-        summary.add_row("Lock Order Velocitions:", f"[red]{result.lock_order_violations}[/red]")
-        summary.add_row("Mutex Errors:", f"[red]{result.mutex_errors}[/red]")
+        summary.add_row("Data Races:", Text(str(result.data_races), style=self._STYLE_RED))
+        summary.add_row(
+            "Lock Order Velocitions:",
+            Text(str(result.lock_order_violations), style=self._STYLE_RED)
+        )
+        summary.add_row("Mutex Errors:", Text(str(result.mutex_errors), style=self._STYLE_RED))
 
         status = "✅ Thread Safe" if result.total_issues == 0 else "⚠️ Threading Issues Detected"
         color = "green" if result.total_issues == 0 else "red"
 
-        self.console.print(Panel(
+        renderables: list[RenderableType] = [Panel(
             summary,
             title=f"[bold]{status}[/bold]",
             border_style=color
-        ))
+        )]
 
         # Issues Table
         if result.issues:
-            self.console.print()
-            table = Table(
-                title="🧵 Threading Issues",
-                box=box.ROUNDED,
-                show_lines=True,
-                title_style="bold magenta"
-            )
-            
-            table.add_column("Type", style="bold red")
-            table.add_column("Thread", justify="right")
-            table.add_column("Description", style="white")
-            table.add_column("Location", style="cyan")
+            renderables += ["", self._build_issues_table(result.issues)]
+
+        self._print(Group(*renderables))
 
-            for issue in result.issues:
-                location = issue.stack_trace[0] if issue.stack_trace else "Unknown"
-                table.add_row(
-                    issue.issue_type,
-                    f"#{issue.thread_id}" if issue.thread_id is not None else "-",
-                    issue.description,
-                    location
-                )
-            
-            self.console.print(table)
+    def _build_issues_table(self, issues: "list[ThreadIssue]") -> Table:
+        """Build table of detected threading issues."""
+        table = Table(
+            title="🧵 Threading Issues",
+            box=box.ROUNDED,
+            show_lines=False,
+            title_style="bold magenta"
+        )
+        
+        table.add_column("Type", style="bold red")
+        table.add_column("Thread", justify="right")
+        table.add_column("Description", style="white")
+        table.add_column("Location", style="cyan", overflow="fold")
+
+        for issue in issues:
+            location = issue.stack_trace[0] if issue.stack_trace else "Unknown"
+            table.add_row(
+                issue.issue_type,
+                f"#{issue.thread_id}" if issue.thread_id is not None else "-",
+                issue.description,
+                location
+            )
+        
+        return table
 
-    def _format_rate(self, rate: float) -> str:
+    def _format_rate(self, rate: float) -> Text:
         """Format percentage rate."""
         if rate == 0:
-            return "[green]0.00%[/green]"
+            return Text("0.00%", style=self._STYLE_GREEN)
         elif rate > 10:
-             return f"[red]{rate:.2f}%[/red]"
+            return Text(f"{rate:.2f}%", style=self._STYLE_RED)
         elif rate > 5:
-             return f"[yellow]{rate:.2f}%[/yellow]"
-        return f"{rate:.2f}%"
+            return Text(f"{rate:.2f}%", style=self._STYLE_YELLOW)
+        return Text(f"{rate:.2f}%")
 
     def _format_big_num(self, num: int) -> str:
         """Format large numbers with commas."""
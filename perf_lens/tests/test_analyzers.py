@@ -2,14 +2,43 @@
 Tests for analyzer modules.
 """
 
+import asyncio
+import io
+import os
+import threading
+from pathlib import Path
+
 import pytest
 from unittest.mock import patch, MagicMock
 
-from perf_lens.analyzers.memory import MemoryAnalyzer, MemoryAnalysisResult
+from perf_lens.analyzers.memory import (
+    MemoryAnalyzer,
+    MemoryAnalysisResult,
+    _has_sanitizer_runtime,
+)
 from perf_lens.analyzers.cpu import CPUAnalyzer, CPUAnalysisResult
 from perf_lens.analyzers.cache import CacheAnalyzer
 from perf_lens.analyzers.syscall import SyscallAnalyzer
 from perf_lens.analyzers.thread import ThreadAnalyzer
+from perf_lens.analyzers import run_all
+from perf_lens.analyzers._tools import (
+    find_flamegraph_script,
+    find_tool,
+    run_tool,
+    temp_log_path,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_tool_cache():
+    """Drop memoized tool lookups so patched shutil.which takes effect."""
+    find_tool.cache_clear()
+    find_flamegraph_script.cache_clear()
+    _has_sanitizer_runtime.cache_clear()
+    yield
+    find_tool.cache_clear()
+    find_flamegraph_script.cache_clear()
+    _has_sanitizer_runtime.cache_clear()
 
 
 class TestMemoryAnalyzer:
@@ -28,21 +57,68 @@ class TestMemoryAnalyzer:
         assert "not found" in result.error.lower() or "not installed" in result.error.lower()
     
     @patch("shutil.which")
-    def test_valgrind_not_installed(self, mock_which):
+    def test_valgrind_not_installed(self, mock_which, tmp_path):
         """Test behavior when valgrind is not installed."""
         mock_which.return_value = None
         analyzer = MemoryAnalyzer()
         assert not analyzer.is_available()
         
-        result = analyzer.analyze("./some_binary")
+        binary = tmp_path / "some_binary"
+        binary.write_bytes(b"")
+        result = analyzer.analyze(str(binary))
         assert result.error is not None
         assert "not installed" in result.error.lower()
     
+    @pytest.mark.parametrize("readelf_output, expected", [
+        (b" 0x01 (NEEDED)  Shared library: [libasan.so.8]\n", True),
+        (b" 0x01 (NEEDED)  Shared library: [liblsan.so.0]\n", True),
+        (b"     1: 0000000000000000  0 FUNC  GLOBAL DEFAULT  UND __asan_init\n", True),
+        (b" 0x01 (NEEDED)  Shared library: [libc.so.6]\n", False),
+    ])
+    def test_detects_sanitizer_runtime(self, tmp_path, readelf_output, expected):
+        """Test LeakSanitizer detection from readelf output."""
+        binary = tmp_path / "app"
+        binary.write_bytes(b"")
+        with patch("shutil.which", return_value="/usr/bin/readelf"), \
+                patch("subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(stdout=readelf_output)
+            assert MemoryAnalyzer()._has_lsan(binary) is expected
+            # The result is cached until the binary changes
+            MemoryAnalyzer()._has_lsan(binary)
+            assert mock_run.call_count == 1
+    
+    def test_skip_parsing(self, tmp_path):
+        """Test that parse=False returns only the raw tool output."""
+        binary = tmp_path / "app"
+        binary.write_bytes(b"")
+        report = b"==1== 50 bytes in 1 blocks are definitely lost\n==1==    at 0x1: malloc\n"
+        analyzer = MemoryAnalyzer()
+        with patch.object(analyzer, "_has_lsan", return_value=True), \
+                patch("perf_lens.analyzers.memory.run_tool", return_value=(report, None)):
+            result = analyzer.analyze(str(binary), parse=False)
+        assert result.error is None
+        assert result.leaks == []
+        assert result.raw_output == report.decode()
+    
+    def test_lsan_keeps_user_options(self, tmp_path, monkeypatch):
+        """Test that sanitizer options from the environment are extended, not replaced."""
+        binary = tmp_path / "app"
+        binary.write_bytes(b"")
+        monkeypatch.setenv("ASAN_OPTIONS", "halt_on_error=0")
+        monkeypatch.delenv("LSAN_OPTIONS", raising=False)
+        analyzer = MemoryAnalyzer()
+        with patch.object(analyzer, "_has_lsan", return_value=True), \
+                patch("perf_lens.analyzers.memory.run_tool", return_value=(b"", None)) as mock_run:
+            analyzer.analyze(str(binary))
+        env = mock_run.call_args.kwargs["env"]
+        assert env["ASAN_OPTIONS"] == "halt_on_error=0:detect_leaks=1"
+        assert env["LSAN_OPTIONS"] == "print_suppressions=0"
+    
     def test_parse_valgrind_output(self):
         """Test parsing Valgrind output."""
         analyzer = MemoryAnalyzer()
         
-        sample_output = """
+        sample_output = b"""
 ==12345== HEAP SUMMARY:
 ==12345==     in use at exit: 100 bytes in 2 blocks
 ==12345==   total heap usage: 10 allocs, 8 frees, 1,000 bytes allocated
@@ -65,6 +141,39 @@ class TestMemoryAnalyzer:
         assert result.indirectly_lost_bytes == 10
         assert result.possibly_lost_bytes == 5
         assert result.still_reachable_bytes == 35
+        assert result.total_leaks == 1
+        assert result.leaks[0].bytes_lost == 50
+        assert result.leaks[0].leak_type == "definitely lost"
+        assert result.leaks[0].stack_trace == [
+            "at 0x1234: malloc (vg_replace_malloc.c:123)",
+            "by 0x5678: main (test.cpp:10)",
+        ]
+
+    def test_parse_lsan_output(self):
+        """Test parsing LeakSanitizer output."""
+        analyzer = MemoryAnalyzer()
+
+        sample_output = b"""
+=================================================================
+==12345==ERROR: LeakSanitizer: detected memory leaks
+
+Direct leak of 50 byte(s) in 1 object(s) allocated from:
+    #0 0x7f0000001000 in malloc (/lib/libasan.so.8+0xdb000)
+    #1 0x55d0c4a1b2c3 in main /tmp/test.cpp:10
+
+Indirect leak of 10 byte(s) in 1 object(s) allocated from:
+    #0 0x7f0000001000 in malloc (/lib/libasan.so.8+0xdb000)
+
+SUMMARY: AddressSanitizer: 60 byte(s) leaked in 2 allocation(s).
+"""
+
+        result = analyzer._parse_lsan_output("./test_binary", sample_output)
+
+        assert result.total_leaks == 2
+        assert result.definitely_lost_bytes == 50
+        assert result.indirectly_lost_bytes == 10
+        assert result.leaks[0].leak_type == "definitely lost"
+        assert result.leaks[0].stack_trace[1] == "0x55d0c4a1b2c3 in main /tmp/test.cpp:10"
 
 
 class TestCPUAnalyzer:
@@ -89,6 +198,143 @@ class TestCPUAnalyzer:
         analyzer = CPUAnalyzer()
         assert not analyzer.is_available()
 
+    @patch("subprocess.Popen")
+    def test_process_perf_script_output(self, mock_popen):
+        """Test hotspot aggregation from perf script output."""
+        sample_output = (
+            b"app 1234 100.000001:     10101 cycles:u: \n"
+            b"\t    55d0c4a1b2c3 compute+0x1f (/tmp/app)\n"
+            b"\t    55d0c4a1b2d4 main+0x10 (/tmp/app)\n"
+            b"\n"
+            b"app 1234 100.000002:     10101 cycles:u: \n"
+            b"\t    55d0c4a1b2c3 compute+0x22 (/tmp/app)\n"
+            b"\n"
+            b"app 1234 100.000003:     10101 cycles:u: \n"
+            b"\t    7f0000001000 __memmove_avx (/usr/lib/libc.so.6)\n"
+            b"\t    55d0c4a1b2c3 compute+0x1f (/tmp/app)\n"
+            b"\n"
+        )
+        proc = MagicMock()
+        proc.stdout = io.BytesIO(sample_output)
+        proc.wait.return_value = 0
+        mock_popen.return_value = proc
+
+        analyzer = CPUAnalyzer()
+        hotspots, total_samples, _, flamegraph_path = analyzer._process_perf_data(
+            Path("perf.data"), None
+        )
+
+        assert total_samples == 3
+        assert flamegraph_path is None
+        assert hotspots[0].function_name == "compute"
+        assert hotspots[0].module == "app"
+        assert hotspots[0].samples == 2
+        assert hotspots[1].function_name == "__memmove_avx"
+        assert hotspots[1].module == "libc.so.6"
+    
+    @patch("perf_lens._fastparse.parse_perf_frame", side_effect=ValueError("bad frame"))
+    def test_perf_script_failure_reaps_pipeline(self, mock_parse, tmp_path):
+        """Test that a parse error kills perf script and the flame graph chain."""
+        script_proc = MagicMock()
+        script_proc.stdout = io.BytesIO(b"app 1234 1.0: 1 cycles:u:\n\t    1 f (/app)\n")
+        collapse_proc, flamegraph_proc = MagicMock(), MagicMock()
+        output_svg = tmp_path / "app_flamegraph.svg"
+        output_svg.write_bytes(b"<svg")
+        
+        analyzer = CPUAnalyzer()
+        with patch("subprocess.Popen", return_value=script_proc), \
+                patch.object(analyzer, "_start_flamegraph", return_value=(collapse_proc, flamegraph_proc)):
+            with pytest.raises(ValueError):
+                analyzer._process_perf_data(Path("perf.data"), output_svg)
+        
+        for proc in (script_proc, collapse_proc, flamegraph_proc):
+            proc.kill.assert_called_once()
+            proc.wait.assert_called_once()
+        assert not output_svg.exists()
+    
+    def test_perf_data_removed_on_failure(self, tmp_path):
+        """Test that perf.data is deleted when processing it fails."""
+        binary = tmp_path / "app"
+        binary.touch()
+        perf_data = tmp_path / "perf.data"
+        
+        async def fake_record(*args):
+            perf_data.write_bytes(b"PERFILE2")
+            return 0, ""
+        
+        analyzer = CPUAnalyzer()
+        analyzer._perf_path = "/usr/bin/perf"
+        with patch.object(analyzer, "_record", side_effect=fake_record), \
+                patch.object(analyzer, "_process_perf_data", side_effect=ValueError("bad frame")):
+            result = analyzer.analyze(str(binary), output_dir=str(tmp_path))
+        
+        assert result.error == "bad frame"
+        assert not perf_data.exists()
+    
+    @patch("subprocess.Popen")
+    def test_flamegraph_start_failure_cleans_up(self, mock_popen, tmp_path):
+        """Test that a failed flamegraph.pl start stops the collapse step."""
+        (tmp_path / "stackcollapse-perf.pl").touch()
+        collapse_proc = MagicMock()
+        mock_popen.side_effect = [collapse_proc, OSError("perl: not found")]
+        output_svg = tmp_path / "flamegraph.svg"
+        
+        analyzer = CPUAnalyzer()
+        analyzer._flamegraph_script = str(tmp_path / "flamegraph.pl")
+        
+        assert analyzer._start_flamegraph(output_svg) is None
+        collapse_proc.kill.assert_called_once()
+        collapse_proc.wait.assert_called_once()
+        assert not output_svg.exists()
+
+
+class FakePerfDaemon:
+    """
+    Stand-in for a perf stat --control daemon on real pipes.
+    
+    Acks every command like perf does and, on "disable", appends one
+    interval record to the output file, as perf prints the window's counts.
+    """
+    
+    INTERVAL = b"     2.000100,4282,,cache-misses,1000,100.00,,\n"
+    
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.commands = []
+        self.overlapped = False
+        self._enabled = False
+        self.ctl_read, self.ctl_write = os.pipe()
+        self.ack_read, self.ack_write = os.pipe()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+    
+    def _serve(self):
+        with os.fdopen(self.ctl_read, "rb") as ctl:
+            for line in ctl:
+                command = line.strip().decode()
+                self.commands.append(command)
+                if command == "enable":
+                    self.overlapped |= self._enabled
+                    self._enabled = True
+                elif command == "disable":
+                    self._enabled = False
+                    with open(self.output_path, "ab") as f:
+                        f.write(self.INTERVAL)
+                os.write(self.ack_write, b"ack\n")
+        os.close(self.ack_write)
+    
+    def attach(self, analyzer):
+        analyzer._daemon = MagicMock()
+        analyzer._daemon_ctl_fd = self.ctl_write
+        analyzer._daemon_ack_fd = self.ack_read
+        analyzer._daemon_output = str(self.output_path)
+    
+    def close(self):
+        os.close(self.ctl_write)
+        self._thread.join(timeout=5)
+        os.close(self.ack_read)
+
+
 class TestCacheAnalyzer:
     """Test CacheAnalyzer class."""
     
@@ -107,6 +353,120 @@ class TestCacheAnalyzer:
         analyzer = CacheAnalyzer()
         assert not analyzer.is_available()
 
+    @patch("perf_lens.analyzers.cache._supported_events")
+    def test_unsupported_events_filtered(self, mock_supported):
+        mock_supported.return_value = frozenset({"cpu-cycles", "instructions", "LLC-loads"})
+        analyzer = CacheAnalyzer()
+
+        events = analyzer._event_spec()
+
+        assert events == "{cycles,instructions},{LLC-loads},duration_time,user_time,system_time"
+
+    def test_parse_perf_stat_csv_output(self):
+        """Test parsing perf stat -x, output."""
+        analyzer = CacheAnalyzer()
+
+        sample_output = b"""# started on Mon Jan  1 00:00:00 2024
+
+2000,,cycles:u,1000,100.00,,
+3000,,instructions:u,1000,100.00,1.50,insn per cycle
+1000,,L1-dcache-loads:u,1000,100.00,,
+100,,L1-dcache-load-misses:u,1000,100.00,10.00,of all L1-dcache accesses
+<not supported>,,LLC-stores:u,0,100.00,,
+50,,branch-instructions:u,1000,100.00,,
+5,,branch-misses:u,1000,100.00,10.00,of all branches
+1500000000,ns,duration_time,1500000000,100.00,,
+"""
+
+        result = analyzer._parse_output("./test_binary", sample_output)
+
+        assert result.total_cycles == 2000
+        assert result.total_instructions == 3000
+        assert result.ipc == 1.5
+        assert result.duration_seconds == 1.5
+        assert result.branch_miss_rate == 10.0
+        assert result.cache_stats[0].level == "L1-Data"
+        assert result.cache_stats[0].load_miss_rate == 10.0
+
+    @patch("shutil.which", return_value=None)
+    def test_start_daemon_requires_perf(self, mock_which):
+        """Test that the perf stat daemon cannot start without perf."""
+        analyzer = CacheAnalyzer()
+        with pytest.raises(RuntimeError):
+            analyzer.start_daemon()
+
+    def test_parse_daemon_interval_output(self):
+        """Test summing perf stat -I records across intervals."""
+        analyzer = CacheAnalyzer()
+
+        sample_output = b"""     1.000312,2000,,cycles,1000,100.00,,
+     1.000312,3000,,instructions,1000,100.00,1.50,insn per cycle
+     2.000420,1000,,cycles,1000,100.00,,
+     2.000420,<not counted>,,instructions,0,100.00,,
+"""
+
+        result = analyzer._parse_daemon_output("./test_binary", sample_output, 0.5)
+
+        assert result.total_cycles == 3000
+        assert result.total_instructions == 3000
+        assert result.duration_seconds == 0.5
+
+    @pytest.fixture
+    def fake_daemon(self, tmp_path):
+        """A fake daemon whose output file already holds an earlier run's counts."""
+        output_path = tmp_path / "perf-stat.csv"
+        output_path.write_bytes(b"     1.000100,999999,,cache-misses,1000,100.00,,\n")
+        daemon = FakePerfDaemon(output_path)
+        yield daemon
+        daemon.close()
+
+    def test_daemon_control_exchange(self, fake_daemon):
+        """Test the enable/ping/disable/ping exchange and reading from the start offset."""
+        analyzer = CacheAnalyzer()
+        fake_daemon.attach(analyzer)
+
+        result = analyzer._analyze_with_daemon("/bin/true", None, 10, keep_raw=False)
+
+        assert result.error is None
+        assert fake_daemon.commands == ["enable", "ping", "disable", "ping"]
+        # Only the record printed for this window is counted
+        assert result._stats_dict == {"cache-misses": 4282}
+
+    def test_concurrent_daemon_analyses_do_not_overlap(self, fake_daemon):
+        """Test that concurrent analyses on one daemon take turns."""
+        analyzer = CacheAnalyzer()
+        analyzer._perf_path = "/usr/bin/perf"
+        fake_daemon.attach(analyzer)
+
+        async def run_both():
+            return await asyncio.gather(
+                analyzer.analyze_async("/bin/true"),
+                analyzer.analyze_async("/bin/true"),
+            )
+
+        results = asyncio.run(run_both())
+
+        assert not fake_daemon.overlapped
+        assert fake_daemon.commands == ["enable", "ping", "disable", "ping"] * 2
+        assert [r._stats_dict for r in results] == [{"cache-misses": 4282}] * 2
+
+    def test_dead_daemon_reported(self, tmp_path):
+        """Test that a daemon that has exited is reported as an error."""
+        ctl_read, ctl_write = os.pipe()
+        ack_read, ack_write = os.pipe()
+        os.close(ctl_read)
+        analyzer = CacheAnalyzer()
+        analyzer._daemon_ctl_fd = ctl_write
+        analyzer._daemon_ack_fd = ack_read
+        analyzer._daemon_output = str(tmp_path / "perf-stat.csv")
+        try:
+            result = analyzer._analyze_with_daemon("/bin/true", None, 10, keep_raw=False)
+        finally:
+            for fd in (ctl_write, ack_read, ack_write):
+                os.close(fd)
+
+        assert result.error == "perf stat daemon is no longer running"
+
 
 class TestSyscallAnalyzer:
     """Test SyscallAnalyzer class."""
@@ -126,6 +486,60 @@ class TestSyscallAnalyzer:
         analyzer = SyscallAnalyzer()
         assert not analyzer.is_available()
 
+    def test_parse_strace_summary(self):
+        """Test parsing strace -c summary table."""
+        analyzer = SyscallAnalyzer()
+
+        sample_output = """% time     seconds  usecs/call     calls    errors syscall
+------ ----------- ----------- --------- --------- ----------------
+ 60.00    0.000600          60        10           write
+ 30.00    0.000300          30        10         2 openat
+ 10.00    0.000100          10        10           read
+------ ----------- ----------- --------- --------- ----------------
+100.00    0.001000          33        30         2 total
+"""
+
+        result = analyzer._parse_output("./test_binary", sample_output)
+
+        assert result.total_syscalls == 30
+        assert result.total_time_seconds == 0.001
+        assert [s.name for s in result.syscalls] == ["write", "openat", "read"]
+        assert result.syscalls[1].errors == 2
+
+    def test_parse_strace_summary_blank_columns(self):
+        """Test that blank usecs/call and errors cells don't shift columns."""
+        analyzer = SyscallAnalyzer()
+
+        sample_output = """% time     seconds  usecs/call     calls    errors syscall
+------ ----------- ----------- --------- --------- ----------------
+ 90.00    0.000900          90        10         2 openat
+ 10.00    0.000100                    10           read
+------ ----------- ----------- --------- --------- ----------------
+100.00    0.001000                    20         2 total
+"""
+
+        result = analyzer._parse_output("./test_binary", sample_output)
+
+        assert result.total_syscalls == 20
+        assert result.total_time_seconds == 0.001
+        assert [(s.name, s.calls, s.errors) for s in result.syscalls] == [
+            ("openat", 10, 2),
+            ("read", 10, 0),
+        ]
+
+    def test_parse_strace_ambiguous_total_row(self):
+        """Test that an ambiguous total row falls back to summing the rows."""
+        analyzer = SyscallAnalyzer()
+
+        sample_output = """ 90.00    0.000900          90        10         2 openat
+ 10.00    0.000100          10        10           read
+100.00    0.001000        20         2 total
+"""
+
+        result = analyzer._parse_output("./test_binary", sample_output)
+
+        assert result.total_syscalls == 20
+
 
 class TestThreadAnalyzer:
     """Test ThreadAnalyzer class."""
@@ -145,3 +559,117 @@ class TestThreadAnalyzer:
         analyzer = ThreadAnalyzer()
         assert not analyzer.is_available()
 
+    def test_parse_helgrind_output(self):
+        """Test parsing Helgrind report blocks."""
+        analyzer = ThreadAnalyzer()
+
+        sample_output = """==123== Helgrind, a thread error detector
+==123== 
+==123== ---Thread-Announcement------------------------------------------
+==123== 
+==123== Thread #2 was created
+==123==    at 0x4C2F: clone (clone.S:71)
+==123== 
+==123== ----------------------------------------------------------------
+==123== 
+==123== Possible data race during write of size 4 at 0x10C014 by thread #3
+==123== Locks held: none
+==123==    at 0x109196: worker (race.c:6)
+==123==    by 0x4842B1A: mythread_wrapper (hg_intercepts.c:406)
+==123== 
+==123== This conflicts with a previous write of size 4 by thread #2
+==123==    at 0x109196: worker (race.c:6)
+==123== 
+==123== ERROR SUMMARY: 1 errors from 1 contexts (suppressed: 0 from 0)
+"""
+
+        result = analyzer._parse_output("./test_binary", sample_output)
+
+        assert result.total_issues == 1
+        assert result.data_races == 1
+        issue = result.issues[0]
+        assert issue.description.startswith("Possible data race during write")
+        assert issue.stack_trace[0] == "at 0x109196: worker (race.c:6)"
+
+
+class TestRunAll:
+    """Test concurrent analyzer execution."""
+
+    def test_run_all_nonexistent_binary(self):
+        cache_result, cpu_result = asyncio.run(run_all("/nonexistent/binary"))
+        assert cache_result.error is not None
+        assert cpu_result.error is not None
+
+    def test_sync_analyze_inside_running_loop(self):
+        """Test that the blocking analyze() also works when an event loop is running."""
+        async def main():
+            return (
+                CacheAnalyzer().analyze("/nonexistent/binary"),
+                CPUAnalyzer().analyze("/nonexistent/binary"),
+            )
+
+        cache_result, cpu_result = asyncio.run(main())
+        assert cache_result.error is not None
+        assert cpu_result.error is not None
+
+
+class TestFindTool:
+    """Test memoized tool discovery."""
+    
+    @patch("shutil.which", return_value="/usr/bin/valgrind")
+    def test_lookup_shared_across_analyzers(self, mock_which):
+        """Test that $PATH is searched once per tool, not per analyzer."""
+        for _ in range(3):
+            assert MemoryAnalyzer().is_available()
+            assert ThreadAnalyzer().is_available()
+        
+        mock_which.assert_called_once_with("valgrind")
+
+
+class TestRunTool:
+    """Test the shared tool runner."""
+    
+    def test_reads_stderr(self):
+        """Test that the report is taken from stderr by default."""
+        output, error = run_tool(["sh", "-c", "echo report >&2"], timeout=10)
+        assert error is None
+        assert output == b"report\n"
+    
+    def test_reads_log_file(self):
+        """Test that the report is read from the log file when given."""
+        with temp_log_path() as log_path:
+            output, error = run_tool(
+                ["sh", "-c", f"echo report > {log_path}; echo noise >&2"],
+                timeout=10,
+                log_path=log_path
+            )
+        assert error is None
+        assert output == b"report\n"
+    
+    def test_empty_log_reports_stderr(self):
+        """Test that a tool failing before writing its log is an error."""
+        with temp_log_path() as log_path:
+            output, error = run_tool(
+                ["sh", "-c", "echo 'strace: ptrace(PTRACE_TRACEME, ...): Operation not permitted' >&2; exit 1"],
+                timeout=10,
+                log_path=log_path
+            )
+        assert output == b""
+        assert error == "strace: ptrace(PTRACE_TRACEME, ...): Operation not permitted"
+    
+    def test_report_kept_on_nonzero_exit(self):
+        """Test that a written report is used even if the target exits non-zero."""
+        with temp_log_path() as log_path:
+            output, error = run_tool(
+                ["sh", "-c", f"echo report > {log_path}; exit 3"],
+                timeout=10,
+                log_path=log_path
+            )
+        assert error is None
+        assert output == b"report\n"
+    
+    def test_timeout(self):
+        """Test that a timeout is reported as an error."""
+        output, error = run_tool(["sleep", "5"], timeout=0.1)
+        assert output == b""
+        assert error == "Analysis timed out after 0.1 seconds"
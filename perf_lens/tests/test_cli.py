@@ -2,18 +2,90 @@
 Tests for the CLI module.
 """
 
+import multiprocessing
+import os
+import shutil
+import subprocess
+
 import pytest
 from click.testing import CliRunner
 
+from perf_lens import cli
+from perf_lens.analyzers._tools import find_tool
 from perf_lens.cli import main
 
 
-@pytest.fixture
+# strace stand-in: writes a fixed -c summary to the file given with -o
+FAKE_STRACE = """#!/bin/sh
+while [ "$1" != "-o" ]; do shift; done
+printf '%s\\n' \\
+    '% time     seconds  usecs/call     calls    errors syscall' \\
+    '------ ----------- ----------- --------- --------- ----------------' \\
+    ' 60.00    0.000600          60        10           write' \\
+    '------ ----------- ----------- --------- --------- ----------------' \\
+    '100.00    0.000600          60        10           total' > "$2"
+"""
+
+# Leaks one 50-byte block
+LEAKY_C = """#include <stdlib.h>
+int main(void) { void *p = malloc(50); p = 0; return 0; }
+"""
+
+
+@pytest.fixture(scope="session")
 def runner():
-    """Create a CLI test runner."""
+    """Create a CLI test runner shared by all tests."""
     return CliRunner()
 
 
+@pytest.fixture
+def fake_tools(tmp_path, monkeypatch):
+    """Put a fake strace, and nothing else, on PATH; return a target binary."""
+    tools = tmp_path / "bin"
+    tools.mkdir()
+    strace = tools / "strace"
+    strace.write_text(FAKE_STRACE)
+    strace.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tools))
+    find_tool.cache_clear()
+    binary = tmp_path / "app"
+    binary.touch()
+    yield str(binary)
+    find_tool.cache_clear()
+
+
+@pytest.fixture
+def sanitizer_binary(tmp_path, monkeypatch):
+    """Build a leaking -fsanitize=address binary; leave only readelf on PATH."""
+    gcc, readelf = shutil.which("gcc"), shutil.which("readelf")
+    if gcc is None or readelf is None:
+        pytest.skip("gcc and readelf are required")
+    source = tmp_path / "leak.c"
+    source.write_text(LEAKY_C)
+    binary = tmp_path / "leak"
+    build = subprocess.run(
+        [gcc, "-fsanitize=address", "-g", "-o", str(binary), str(source)],
+        capture_output=True
+    )
+    if build.returncode != 0:
+        pytest.skip("gcc can't build AddressSanitizer binaries here")
+    
+    # No Valgrind (or any other tool) on PATH
+    tools = tmp_path / "bin"
+    tools.mkdir()
+    (tools / "readelf").symlink_to(readelf)
+    monkeypatch.setenv("PATH", str(tools))
+    find_tool.cache_clear()
+    yield str(binary)
+    find_tool.cache_clear()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def warm_cli(runner):
+    """Invoke the CLI once up front so lazy setup isn't charged to the first test."""
+    runner.invoke(main, ["--help"], catch_exceptions=False)
+
+
 class TestCLI:
     """Test CLI commands."""
     
@@ -23,6 +95,7 @@ class TestCLI:
         assert result.exit_code == 0
         assert "Perf-Lens" in result.output
         assert "analyze" in result.output
+        assert "--no-spinner" in result.output
     
     def test_version(self, runner):
         """Test that --version works."""
@@ -72,6 +145,13 @@ class TestCLI:
         assert "BINARY" in result.output
         assert "--timeout" in result.output
 
+    def test_analyze_all_help(self, runner):
+        """Test that analyze all --help works."""
+        result = runner.invoke(main, ["analyze", "all", "--help"])
+        assert result.exit_code == 0
+        assert "BINARY" in result.output
+        assert "--duration" in result.output
+        assert "--output" in result.output
     
     def test_check_command(self, runner):
         """Test that check command works."""
@@ -88,6 +168,13 @@ class TestAnalyzeMemoryCommand:
         """Test error when binary doesn't exist."""
         result = runner.invoke(main, ["analyze", "memory", "/nonexistent/binary"])
         assert result.exit_code != 0
+    
+    def test_sanitizer_binary_without_valgrind(self, runner, sanitizer_binary):
+        """Test that an ASan build is analyzed with LeakSanitizer when Valgrind is missing."""
+        result = runner.invoke(main, ["analyze", "memory", sanitizer_binary])
+        assert result.exit_code == 0, result.output
+        assert "Valgrind is not installed" not in result.output
+        assert "Definitely Lost:\t50 B" in result.output
 
 
 class TestAnalyzeCPUCommand:
@@ -115,6 +202,14 @@ class TestAnalyzeSyscallCommand:
         """Test error when binary doesn't exist."""
         result = runner.invoke(main, ["analyze", "syscall", "/nonexistent/binary"])
         assert result.exit_code != 0
+    
+    def test_raw_output_only(self, runner, fake_tools):
+        """Test that --raw shows the strace table instead of the parsed report."""
+        result = runner.invoke(main, ["analyze", "syscall", fake_tools, "--raw"])
+        assert result.exit_code == 0, result.output
+        assert "Raw strace Output:" in result.output
+        assert "100.00    0.000600          60        10           total" in result.output
+        assert "Top System Calls by Time" not in result.output
 
 
 class TestAnalyzeThreadCommand:
@@ -125,3 +220,45 @@ class TestAnalyzeThreadCommand:
         result = runner.invoke(main, ["analyze", "thread", "/nonexistent/binary"])
         assert result.exit_code != 0
 
+
+class TestAnalyzeAllCommand:
+    """Test combined analysis command."""
+    
+    def test_missing_binary(self, runner):
+        """Test error when binary doesn't exist."""
+        result = runner.invoke(main, ["analyze", "all", "/nonexistent/binary"])
+        assert result.exit_code != 0
+    
+    def test_sanitizer_binary_without_valgrind(self, runner, sanitizer_binary):
+        """Test that memory analysis isn't skipped for an ASan build without Valgrind."""
+        result = runner.invoke(main, ["analyze", "all", sanitizer_binary])
+        assert result.exit_code == 0, result.output
+        assert "Skipping memory" not in result.output
+        assert "Definitely Lost:\t50 B" in result.output
+    
+    def test_runs_available_analyses(self, runner, fake_tools):
+        """Test a full run through the worker pool with fake tools."""
+        result = runner.invoke(main, ["analyze", "all", fake_tools])
+        
+        assert result.exit_code == 0, result.output
+        assert "Skipping memory" in result.output
+        assert "Skipping cpu" in result.output
+        assert "Binary:\t" + fake_tools in result.output
+        assert "write\t60.00%\t0.000600\t10\t-" in result.output
+    
+    @pytest.mark.skipif(
+        multiprocessing.get_start_method() != "fork",
+        reason="patched worker function only reaches forked workers"
+    )
+    def test_worker_crash_reported(self, runner, fake_tools, monkeypatch):
+        """Test that a dead worker process is reported as a failed analysis."""
+        monkeypatch.setattr(cli, "_run_analysis", _crash)
+        result = runner.invoke(main, ["analyze", "all", fake_tools])
+        
+        assert result.exit_code == 0, result.output
+        assert "== ❌ Syscall Analysis Failed ==" in result.output
+
+
+def _crash(*args):
+    """Worker function that kills its process."""
+    os._exit(1)
@@ -0,0 +1,76 @@
+"""
+Tests for the reporters module.
+"""
+
+import pytest
+
+from perf_lens.analyzers.syscall import SyscallAnalysisResult, SyscallInfo
+from perf_lens.reporters import ConsoleReporter
+
+
+class TestConsoleReporter:
+    """Test ConsoleReporter formatting helpers."""
+    
+    @pytest.mark.parametrize("bytes_count, expected", [
+        (0, "0 B"),
+        (1, "1 B"),
+        (1023, "1023 B"),
+        (1024, "1.00 KB"),
+        (1536, "1.50 KB"),
+        (1024 ** 2, "1.00 MB"),
+        (5 * 1024 ** 3, "5.00 GB"),
+        (2048 * 1024 ** 3, "2048.00 GB"),
+    ])
+    def test_format_bytes(self, bytes_count, expected):
+        """Test human-readable byte formatting."""
+        assert ConsoleReporter()._format_bytes(bytes_count) == expected
+    
+    def test_cached_text_reused(self):
+        """Test that repeated cell values share one styled Text."""
+        reporter = ConsoleReporter()
+        text = reporter._cached_text("write", reporter._STYLE_BOLD_CYAN)
+        
+        assert text.plain == "write"
+        assert reporter._cached_text("write", reporter._STYLE_BOLD_CYAN) is text
+        assert reporter._cached_text("write", reporter._STYLE_CYAN) is not text
+    
+    def test_plain_report(self, capsys):
+        """Test tab-separated plain-text output."""
+        reporter = ConsoleReporter(plain=True)
+        reporter.report_syscall(SyscallAnalysisResult(
+            binary_path="./test_binary",
+            total_syscalls=10,
+            total_time_seconds=0.0006,
+            syscalls=[SyscallInfo("write", 10, 0, 0.0006, 60.0)],
+            raw_output=""
+        ))
+        
+        out = capsys.readouterr().out
+        assert "== ⚙️ System Call Analysis ==\n" in out
+        assert "Binary:\t./test_binary\n" in out
+        assert "Syscall\t% Time\tSeconds\tCalls\tErrors\n" in out
+        assert "write\t60.00%\t0.000600\t10\t-\n" in out
+        assert "╭" not in out
+    
+    def test_recorded_reports_written_on_flush(self, capsys):
+        """Test that record mode holds reports back until flush()."""
+        reporter = ConsoleReporter(plain=False, record=True)
+        for error in ("strace failed", "helgrind failed"):
+            reporter.report_syscall(SyscallAnalysisResult(
+                binary_path="./test_binary",
+                total_syscalls=0,
+                total_time_seconds=0,
+                syscalls=[],
+                raw_output="",
+                error=error
+            ))
+        assert capsys.readouterr().out == ""
+        
+        reporter.flush()
+        out = capsys.readouterr().out
+        assert "strace failed" in out
+        assert "helgrind failed" in out
+        assert "\x1b[" not in out
+        
+        reporter.flush()
+        assert capsys.readouterr().out == ""